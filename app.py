@@ -4,9 +4,11 @@ import os
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 from flask import Flask, render_template, request, jsonify
 from core.scanner import run_scan
-from database.db import init_db, save_results
+from database.db import init_db, enqueue_results
+from utils.helpers_v2 import OrjsonProvider
 
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
 init_db()
 
 @app.route("/")
@@ -24,17 +26,17 @@ def scan():
 
     try:
         results = run_scan(target)
-        save_results(target, results)
+        enqueue_results(target, results)
 
         return jsonify({
             "count": len(results),
             "results": [
                 {
-                    "type": r[0],
-                    "endpoint": r[1],
-                    "payload": r[2]
+                    "type": vuln_type,
+                    "endpoint": endpoint,
+                    "payload": payload
                 }
-                for r in results
+                for vuln_type, endpoint, payload in results
             ]
         })
 
@@ -9,22 +9,19 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from flask import Flask, render_template, request, jsonify
 from core.scanner_v2 import VulnerabilityScanner
-from database.db import init_db, save_results
-from utils.helpers_v2 import LoggerFactory, URLValidator
+from database.db import init_db, enqueue_results
+from utils.helpers_v2 import LoggerFactory, URLValidator, OrjsonProvider
 
 # Configure logging
 logger = LoggerFactory.get_logger(__name__)
 
 # Initialize Flask app
 app = Flask(__name__)
-app.config['JSON_SORT_KEYS'] = False
+app.json = OrjsonProvider(app)
 
 # Initialize database
 init_db()
 
-# Initialize scanner
-scanner = VulnerabilityScanner()
-
 
 # ==================== ERROR HANDLERS ====================
 
@@ -78,15 +75,16 @@ def scan():
 
         logger.info(f"Starting scan: {target}")
 
-        # Execute scan
-        results = scanner.scan(target)
+        # Execute scan (scanner state is per request, so concurrent scans don't mix)
+        with VulnerabilityScanner() as scanner:
+            results = scanner.scan(target)
         result_tuples = scanner.get_results_tuples()
         summary = scanner.get_summary()
 
         # Save to database
         if result_tuples:
-            save_results(target, result_tuples)
-            logger.info(f"Saved {len(result_tuples)} results to database")
+            enqueue_results(target, result_tuples)
+            logger.info(f"Queued {len(result_tuples)} results for the database")
 
         # Return response
         return jsonify({
@@ -121,13 +119,14 @@ def scan_fast():
         logger.info(f"Starting fast scan: {target}")
 
         # Execute fast scan
-        results = scanner.scan_fast(target)
+        with VulnerabilityScanner() as scanner:
+            results = scanner.scan_fast(target)
         result_tuples = scanner.get_results_tuples()
         summary = scanner.get_summary()
 
         # Save to database
         if result_tuples:
-            save_results(target, result_tuples)
+            enqueue_results(target, result_tuples)
 
         return jsonify({
             "success": True,
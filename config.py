@@ -2,4 +2,6 @@ MAX_DEPTH = 2
 REQUEST_TIMEOUT = 5
 THREADS = 5
 RATE_LIMIT_DELAY = 0.4
-USER_AGENT = "VulnX_Pro-Scanner"
\ No newline at end of file
+USER_AGENT = "VulnX_Pro-Scanner"
+MAX_PAGE_SIZE = 2 * 1024 * 1024
+MAX_RESPONSE_SIZE = 64 * 1024
\ No newline at end of file
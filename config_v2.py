@@ -1,6 +1,7 @@
 """
 Enhanced configuration management with environment variable support.
 """
+import functools
 import os
 from typing import Dict, Any
 
@@ -127,6 +128,7 @@ def init_config(env: str = None):
     global _current_config
     _current_config = get_config(env)
     validate_config(_current_config)
+    _config_dict.cache_clear()
 
 
 def get_current_config() -> Config:
@@ -141,6 +143,9 @@ def config_to_dict(config: Config = None) -> Dict[str, Any]:
     """
     Convert config to dictionary.
 
+    The dictionary is built once per config class and shared between
+    callers, so it must be treated as read-only.
+
     Args:
         config: Configuration to convert
 
@@ -150,6 +155,12 @@ def config_to_dict(config: Config = None) -> Dict[str, Any]:
     if config is None:
         config = get_current_config()
 
+    return _config_dict(config)
+
+
+@functools.lru_cache(maxsize=4)
+def _config_dict(config: Config) -> Dict[str, Any]:
+    """Build the dictionary for config_to_dict (cached per config class)"""
     return {
         "debug": config.DEBUG,
         "max_depth": config.MAX_DEPTH,
@@ -10,6 +10,7 @@ from core.detectors_v2 import (
     VulnerabilityAnalyzer,
     SQLInjectionScanner,
     XSSScanner,
+    CombinedScanner,
     ParameterScanner
 )
 from core.constants import (
@@ -27,6 +28,7 @@ __all__ = [
     'VulnerabilityAnalyzer',
     'SQLInjectionScanner',
     'XSSScanner',
+    'CombinedScanner',
     'ParameterScanner',
     'VulnerabilityType',
     'SQLI_PAYLOADS',
@@ -1,10 +1,16 @@
+import re
 from core.payloads import SQL_ERRORS
+from utils.parsing import re_engine
+
+# All error signatures in one case-insensitive pattern, searched in one pass.
+# Responses are raw bytes: the signatures are ASCII, so no decoding is needed.
+# The inline (?i) flag works in both re and re2 (which has no IGNORECASE).
+_SQLI_RE = re_engine.compile(
+    b"(?i)" + b"|".join(re.escape(e.encode()) for e in SQL_ERRORS)
+)
 
 def detect_sqli(response):
-    for error in SQL_ERRORS:
-        if error.lower() in response.lower():
-            return True
-    return False
+    return _SQLI_RE.search(response) is not None
 
 def boolean_based_check(resp_true, resp_false):
     return len(resp_true) != len(resp_false)
\ No newline at end of file
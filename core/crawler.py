@@ -1,28 +1,38 @@
-import requests
 from bs4 import BeautifulSoup
+from collections import deque
 from urllib.parse import urljoin
-from config import REQUEST_TIMEOUT, USER_AGENT, MAX_DEPTH
-
-visited = set()
+from config import REQUEST_TIMEOUT, MAX_DEPTH
+from core.session import session
 
 def crawl(url, depth=0):
-    if depth > MAX_DEPTH or url in visited:
-        return []
+    visited = set()
+    stack = deque([(url, depth)])
+
+    while stack:
+        url, depth = stack.pop()
+        if depth > MAX_DEPTH or url in visited:
+            continue
+
+        visited.add(url)
+
+        # Links found at the last level would be dropped anyway
+        if depth == MAX_DEPTH:
+            continue
 
-    visited.add(url)
-    urls = [url]
+        try:
+            response = session.get(url, timeout=REQUEST_TIMEOUT)
+            soup = BeautifulSoup(response.text, "lxml")
 
-    try:
-        headers = {"User-Agent": USER_AGENT}
-        response = requests.get(url, headers=headers, timeout=REQUEST_TIMEOUT)
-        soup = BeautifulSoup(response.text, "lxml")
+            children = []
+            for link in soup.find_all("a", href=True):
+                full_url = urljoin(url, link["href"])
+                if full_url.startswith(url) and full_url not in visited:
+                    children.append((full_url, depth + 1))
 
-        for link in soup.find_all("a", href=True):
-            full_url = urljoin(url, link["href"])
-            if full_url.startswith(url):
-                urls.extend(crawl(full_url, depth + 1))
+            # Pushed last-first so they pop in document order, as the recursion visited them
+            stack.extend(reversed(children))
 
-    except Exception:
-        pass
+        except Exception:
+            pass
 
-    return list(set(urls))
\ No newline at end of file
+    return list(visited)
\ No newline at end of file
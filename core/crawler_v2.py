@@ -2,108 +2,212 @@
 Web crawler module for discovering URLs within target domains.
 Implements thread-safe URL discovery with depth limiting.
 """
+import asyncio
 import logging
-from typing import List, Set
-from urllib.parse import urljoin, urlparse
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional, Set, Tuple
+from urllib.parse import urldefrag, urljoin
 import requests
-from bs4 import BeautifulSoup
-from config import REQUEST_TIMEOUT, USER_AGENT, MAX_DEPTH
+from lxml import etree, html as lxml_html
+from config import REQUEST_TIMEOUT, USER_AGENT, MAX_DEPTH, THREADS, MAX_PAGE_SIZE
+from core.http_utils import CHUNK_SIZE, create_session, read_capped, read_capped_async
+from utils.parsing import cached_urlparse
+
+try:
+    import aiohttp
+except ImportError:  # Optional: fall back to the thread-pool crawl
+    aiohttp = None
 
 logger = logging.getLogger(__name__)
 
+# Parse raw page bytes straight into lxml; hrefs are pulled out in C
+_HREF_XPATH = etree.XPath("//a/@href", smart_strings=False)
+
 
 class WebCrawler:
     """Thread-safe web crawler for discovering URLs"""
 
-    def __init__(self, max_depth: int = MAX_DEPTH, timeout: int = REQUEST_TIMEOUT):
+    def __init__(
+        self,
+        max_depth: int = MAX_DEPTH,
+        timeout: int = REQUEST_TIMEOUT,
+        max_workers: int = THREADS,
+        max_page_size: int = MAX_PAGE_SIZE,
+        session: Optional[requests.Session] = None,
+        page_handler: Optional[Callable[[str, bytes], None]] = None
+    ):
         """
         Initialize the crawler.
 
         Args:
-            max_depth: Maximum recursion depth for crawling
+            max_depth: Maximum link depth for crawling
             timeout: HTTP request timeout in seconds
+            max_workers: Number of pages fetched concurrently per depth level
+            max_page_size: Bytes read per page; larger bodies are truncated
+            session: Existing session to reuse; a pooled one is created if omitted
+            page_handler: Called with (url, body) for every page fetched, so
+                callers can use the content without requesting it again.
+                May be called from worker threads.
         """
         self.max_depth = max_depth
         self.timeout = timeout
+        self.max_workers = max_workers
+        self.max_page_size = max_page_size
+        self.page_handler = page_handler
         self.visited: Set[str] = set()
         self.user_agent = USER_AGENT
 
-    def _is_valid_url(self, url: str) -> bool:
-        """Check if URL is valid."""
-        try:
-            result = urlparse(url)
-            return all([result.scheme, result.netloc])
-        except Exception:
-            return False
+        if session is not None:
+            self.session = session
+            return
+
+        # Keep-alive session shared by all fetch workers
+        self.session = create_session(max_workers, max_workers * 2)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
 
-    def _is_same_domain(self, base_url: str, target_url: str) -> bool:
-        """Check if target URL belongs to same domain as base URL."""
+    def close(self) -> None:
+        """Close pooled HTTP connections"""
+        self.session.close()
+
+    @staticmethod
+    def _same_netloc(base_netloc: str, target_url: str) -> bool:
+        """Check if target URL is absolute and on the given host."""
         try:
-            base_domain = urlparse(base_url).netloc
-            target_domain = urlparse(target_url).netloc
-            return base_domain == target_domain
+            result = cached_urlparse(target_url)
+            return bool(result.scheme and result.netloc) and result.netloc == base_netloc
         except Exception:
             return False
 
-    def _fetch_page(self, url: str) -> str:
+    def _fetch_page(self, url: str) -> Tuple[bytes, Optional[str]]:
         """
-        Fetch page content with error handling.
+        Fetch raw page content with error handling.
+
+        The body is streamed and reading stops at max_page_size bytes. It is
+        not decoded; lxml decodes it while parsing.
 
         Args:
             url: URL to fetch
 
         Returns:
-            Page content or empty string on failure
+            (body, charset declared in Content-Type) or (b"", None) on failure
         """
         try:
-            headers = {"User-Agent": self.user_agent}
-            response = requests.get(url, headers=headers, timeout=self.timeout)
-            response.raise_for_status()
-            return response.text
+            with self.session.get(url, timeout=self.timeout, stream=True) as response:
+                response.raise_for_status()
+                content = read_capped(response, self.max_page_size)
+                if len(content) >= self.max_page_size:
+                    logger.debug(f"Truncating {url} at {self.max_page_size} bytes")
+                content_type = response.headers.get("Content-Type", "").lower()
+                charset = response.encoding if "charset" in content_type else None
+                return content, charset
         except requests.exceptions.Timeout:
             logger.warning(f"Timeout fetching {url}")
-            return ""
+            return b"", None
         except requests.exceptions.ConnectionError:
             logger.warning(f"Connection error for {url}")
-            return ""
+            return b"", None
         except requests.exceptions.RequestException as e:
             logger.warning(f"Error fetching {url}: {e}")
-            return ""
-
-    def _extract_links(self, url: str, html_content: str) -> List[str]:
+            return b"", None
+
+    def _extract_links(
+        self,
+        url: str,
+        html_content: bytes,
+        encoding: Optional[str] = None
+    ) -> List[str]:
         """
         Extract all links from HTML content.
 
         Args:
             url: Base URL for resolving relative links
-            html_content: HTML content to parse
+            html_content: Raw HTML bytes to parse
+            encoding: Charset from the HTTP headers, if any (otherwise
+                lxml detects it from the document)
 
         Returns:
             List of absolute URLs found in content
         """
         links = []
+        base_netloc = cached_urlparse(url).netloc
         try:
-            soup = BeautifulSoup(html_content, "lxml")
-            for link in soup.find_all("a", href=True):
-                href = link.get("href", "").strip()
+            try:
+                parser = lxml_html.HTMLParser(encoding=encoding) if encoding else None
+            except LookupError:
+                parser = None
+            document = lxml_html.fromstring(html_content, parser=parser)
+            for href in _HREF_XPATH(document):
+                href = href.strip()
                 if not href:
                     continue
 
-                # Handle relative URLs
-                full_url = urljoin(url, href)
+                # Handle relative URLs; fragments never change the fetched page
+                full_url = urldefrag(urljoin(url, href))[0]
 
                 # Validate and filter same-domain links
-                if self._is_valid_url(full_url) and self._is_same_domain(url, full_url):
+                if self._same_netloc(base_netloc, full_url):
                     links.append(full_url)
 
+        except etree.ParserError as e:
+            logger.debug(f"Skipping unparsable page {url}: {e}")
         except Exception as e:
             logger.error(f"Error parsing HTML: {e}")
 
         return links
 
+    def _fetch_links(self, url: str) -> List[str]:
+        """
+        Fetch a page and extract its same-domain links.
+
+        Args:
+            url: URL to fetch
+
+        Returns:
+            List of links found on the page (empty on failure)
+        """
+        html_content, encoding = self._fetch_page(url)
+        if not html_content:
+            return []
+        if self.page_handler is not None:
+            self.page_handler(url, html_content)
+        return self._extract_links(url, html_content, encoding)
+
+    @staticmethod
+    def _merge_links(
+        links: List[str],
+        visited: Set[str],
+        discovered: List[str],
+        frontier: List[str]
+    ) -> None:
+        """
+        Record unseen links as discovered and queue them for the next level.
+
+        Args:
+            links: Links extracted from a page
+            visited: URLs already seen during this crawl
+            discovered: Accumulator list of discovered URLs
+            frontier: URLs to fetch at the next depth level
+        """
+        for link in links:
+            if link not in visited:
+                visited.add(link)
+                discovered.append(link)
+                frontier.append(link)
+
     def crawl(self, start_url: str) -> List[str]:
         """
-        Crawl website starting from given URL.
+        Crawl website breadth-first starting from given URL.
+
+        Uses the asyncio crawl when aiohttp is installed, otherwise pages
+        of each depth level are fetched in parallel on a thread pool. The
+        visited set belongs to this crawl and is only updated from the
+        calling thread, so it needs no locking and concurrent crawls on one
+        instance cannot interfere.
 
         Args:
             start_url: Starting URL for crawl
@@ -111,44 +215,138 @@ class WebCrawler:
         Returns:
             List of discovered URLs
         """
-        # Reset state for new crawl
-        self.visited.clear()
-        discovered_urls = []
+        if aiohttp is not None:
+            return asyncio.run(self.crawl_async(start_url))
+
+        # Fresh state per crawl; self.visited exposes the latest one
+        visited = {start_url}
+        self.visited = visited
+        discovered = [start_url]
+        frontier = [start_url]
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            # Pages at max_depth are never fetched: their links would be dropped
+            for depth in range(self.max_depth):
+                if not frontier:
+                    break
+
+                logger.debug(f"Crawling {len(frontier)} URLs (depth: {depth})")
+
+                next_frontier = []
+                for links in executor.map(self._fetch_links, frontier):
+                    self._merge_links(links, visited, discovered, next_frontier)
+
+                frontier = next_frontier
+
+        return discovered
+
+    async def _fetch_page_async(
+        self,
+        session,
+        semaphore: asyncio.Semaphore,
+        url: str
+    ) -> Tuple[bytes, Optional[str]]:
+        """
+        Fetch raw page content on the event loop.
 
-        return self._crawl_recursive(start_url, 0, discovered_urls)
+        Args:
+            session: aiohttp ClientSession
+            semaphore: Bounds the number of in-flight requests
+            url: URL to fetch
 
-    def _crawl_recursive(self, url: str, depth: int, discovered: List[str]) -> List[str]:
+        Returns:
+            (body, charset declared in Content-Type) or (b"", None) on failure
         """
-        Recursively crawl URLs up to max depth.
+        async with semaphore:
+            try:
+                async with session.get(url) as response:
+                    response.raise_for_status()
+                    content = await read_capped_async(
+                        response.content.iter_chunked(CHUNK_SIZE), self.max_page_size
+                    )
+                    if len(content) >= self.max_page_size:
+                        logger.debug(f"Truncating {url} at {self.max_page_size} bytes")
+                    return content, response.charset
+            except asyncio.TimeoutError:
+                logger.warning(f"Timeout fetching {url}")
+                return b"", None
+            except aiohttp.ClientError as e:
+                logger.warning(f"Error fetching {url}: {e}")
+                return b"", None
+
+    async def _crawl_page_async(
+        self,
+        session,
+        semaphore: asyncio.Semaphore,
+        url: str
+    ) -> List[str]:
+        """
+        Fetch one page on the event loop and extract its same-domain links.
 
         Args:
-            url: Current URL to process
-            depth: Current recursion depth
-            discovered: Accumulator list of discovered URLs
+            session: aiohttp ClientSession
+            semaphore: Bounds the number of in-flight requests
+            url: URL to fetch
 
         Returns:
-            Updated list of discovered URLs
+            List of links found on the page (empty on failure)
         """
-        # Stop conditions
-        if depth > self.max_depth or url in self.visited:
-            return discovered
+        html_content, encoding = await self._fetch_page_async(session, semaphore, url)
+        if not html_content:
+            return []
+        if self.page_handler is not None:
+            self.page_handler(url, html_content)
+        return self._extract_links(url, html_content, encoding)
 
-        # Mark as visited
-        self.visited.add(url)
-        discovered.append(url)
+    async def crawl_async(self, start_url: str) -> List[str]:
+        """
+        Crawl website breadth-first with aiohttp.
 
-        logger.debug(f"Crawling {url} (depth: {depth})")
+        Every URL of a depth level is requested concurrently on a single
+        event loop, bounded by a semaphore of max_workers * 10. Requests
+        carry the headers of the crawler's session. A page that fails is
+        logged and skipped without stopping the crawl.
 
-        # Fetch and parse page
-        html_content = self._fetch_page(url)
-        if not html_content:
-            return discovered
+        Args:
+            start_url: Starting URL for crawl
 
-        # Extract and process links
-        links = self._extract_links(url, html_content)
-        for link in links:
-            if link not in self.visited:
-                self._crawl_recursive(link, depth + 1, discovered)
+        Returns:
+            List of discovered URLs
+        """
+        visited = {start_url}
+        self.visited = visited
+        discovered = [start_url]
+        frontier = [start_url]
+
+        semaphore = asyncio.Semaphore(self.max_workers * 10)
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+
+        # aiohttp manages connection reuse itself
+        headers = {
+            name: value for name, value in self.session.headers.items()
+            if name.lower() != "connection"
+        }
+
+        async with aiohttp.ClientSession(headers=headers, timeout=timeout) as session:
+            for depth in range(self.max_depth):
+                if not frontier:
+                    break
+
+                logger.debug(f"Crawling {len(frontier)} URLs (depth: {depth})")
+
+                pages = await asyncio.gather(
+                    *(self._crawl_page_async(session, semaphore, url) for url in frontier),
+                    return_exceptions=True
+                )
+
+                next_frontier = []
+                for url, links in zip(frontier, pages):
+                    if isinstance(links, Exception):
+                        logger.error(f"Error crawling {url}: {links}")
+                        continue
+                    self._merge_links(links, visited, discovered, next_frontier)
+
+                frontier = next_frontier
 
         return discovered
 
@@ -164,10 +362,12 @@ class WebCrawler:
             List of discovered URLs (only direct links)
         """
         urls = [start_url]
-        html_content = self._fetch_page(start_url)
+        html_content, encoding = self._fetch_page(start_url)
 
         if html_content:
-            links = self._extract_links(start_url, html_content)
+            if self.page_handler is not None:
+                self.page_handler(start_url, html_content)
+            links = self._extract_links(start_url, html_content, encoding)
             urls.extend(links)
 
         return list(set(urls))  # Deduplicate
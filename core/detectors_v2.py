@@ -2,32 +2,122 @@
 Vulnerability detection and analysis module.
 Implements multiple detection techniques for SQL injection and XSS.
 """
+import asyncio
+import functools
 import logging
-from typing import Dict, List, Tuple
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, Union
+from urllib.parse import urlparse, parse_qsl, urlencode, urlunparse
+from config import MAX_PAGE_SIZE
 from core.constants import SQL_ERRORS, SQLI_PAYLOADS, XSS_PAYLOADS
+from utils.parsing import re_engine
+
+try:
+    # SIMD multi-pattern scanner for the SQL error dictionary
+    import hyperscan
+except ImportError:
+    hyperscan = None
 
 logger = logging.getLogger(__name__)
 
+# All SQL error signatures as one case-insensitive pattern: one pass per
+# response. Bodies are raw bytes; the signatures are ASCII. Case is folded
+# with the inline (?i) flag: re2 has no IGNORECASE constant.
+_SQL_ERROR_RE = re_engine.compile(
+    b"(?i)" + b"|".join(re.escape(error.encode()) for error in SQL_ERRORS)
+)
+
+if hyperscan is not None:
+    _SQL_ERROR_DB = hyperscan.Database(mode=hyperscan.HS_MODE_BLOCK)
+    _SQL_ERROR_DB.compile(
+        expressions=[re.escape(error).encode() for error in SQL_ERRORS],
+        flags=[hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_SINGLEMATCH] * len(SQL_ERRORS)
+    )
+
+# Hyperscan scratch space may only be used by one scan at a time
+_scan_state = threading.local()
+
+
+def _stop_on_match(*_) -> bool:
+    """Hyperscan match handler: returning True terminates the scan"""
+    return True
+
+
+def _search_sql_errors(body: bytes) -> bool:
+    """
+    Check a response body against every SQL error signature in one pass.
+
+    Uses the hyperscan database when available, else the combined regex.
+
+    Args:
+        body: Raw HTTP response body
+
+    Returns:
+        True if any signature occurs in body
+    """
+    if hyperscan is None:
+        return _SQL_ERROR_RE.search(body) is not None
+
+    scratch = getattr(_scan_state, "scratch", None)
+    if scratch is None:
+        scratch = _scan_state.scratch = hyperscan.Scratch(_SQL_ERROR_DB)
+
+    try:
+        _SQL_ERROR_DB.scan(body, match_event_handler=_stop_on_match, scratch=scratch)
+    except hyperscan.ScanTerminated:
+        return True
+    return False
+
+
+# Boolean-based probe pair; the true probe doubles as an error-based payload
+_BOOLEAN_TRUE = "' OR 1=1--"
+_BOOLEAN_FALSE = "' OR 1=2--"
+_BOOLEAN_PROBES = (_BOOLEAN_TRUE, _BOOLEAN_FALSE)
+
+# The boolean pair is compared by body length, so it is read up to the page
+# cap: cut at the injector's detection cap, two large pages always tie
+_PROBE_MAX_SIZES = {payload: MAX_PAGE_SIZE for payload in _BOOLEAN_PROBES}
+
+# Every distinct payload a form is probed with, in submission order
+_SQLI_FORM_PROBES = tuple(dict.fromkeys(SQLI_PAYLOADS + list(_BOOLEAN_PROBES)))
+
+# URL parameter probes with the finding each one reports when reflected
+_PARAM_PROBES = (
+    (_BOOLEAN_TRUE, "SQL Injection"),
+    ("<script>alert(1)</script>", "Reflected XSS"),
+)
+
+# XSS payloads with their ASCII bytes, encoded once for reflection checks
+_XSS_FORM_PROBES = tuple((p, p.encode("ascii")) for p in XSS_PAYLOADS)
+_XSS_PAYLOAD_BYTES = dict(_XSS_FORM_PROBES)
+
+# SQL and XSS payloads merged, each distinct payload sent once per form
+_COMBINED_FORM_PROBES = tuple(dict.fromkeys(_SQLI_FORM_PROBES + tuple(XSS_PAYLOADS)))
+
+# Database keywords hinting at an error page, matched on raw response bytes
+_SQL_HINT_RE = re_engine.compile(rb"(?i)sql|postgres|ora-\d+|odbc")
+
 
 class VulnerabilityAnalyzer:
     """Core vulnerability analysis and detection logic"""
 
     @staticmethod
-    def detect_sqli_error(response: str) -> bool:
+    def detect_sqli_error(response: bytes) -> bool:
         """
         Detect SQL injection via error-based method.
 
         Args:
-            response: HTTP response text
+            response: Raw HTTP response body
 
         Returns:
             True if SQL errors detected in response
         """
-        response_lower = response.lower()
-        return any(error.lower() in response_lower for error in SQL_ERRORS)
+        return _search_sql_errors(response)
 
     @staticmethod
-    def detect_sqli_boolean(resp_true: str, resp_false: str, threshold: float = 0.1) -> bool:
+    def detect_sqli_boolean(resp_true: bytes, resp_false: bytes, threshold: float = 0.1) -> bool:
         """
         Detect SQL injection via boolean-based method.
 
@@ -45,32 +135,32 @@ class VulnerabilityAnalyzer:
         true_len = len(resp_true)
         false_len = len(resp_false)
 
-        if true_len == 0 or false_len == 0:
-            return False
-
-        # Calculate difference ratio
-        diff_ratio = abs(true_len - false_len) / max(true_len, false_len)
-        return diff_ratio > threshold
+        # Difference ratio |a - b| / max(a, b) > threshold, without the division
+        if true_len > false_len:
+            return true_len - false_len > threshold * true_len
+        return false_len - true_len > threshold * false_len
 
     @staticmethod
-    def detect_xss_reflected(response: str, payload: str) -> bool:
+    def detect_xss_reflected(response: bytes, payload: Union[str, bytes]) -> bool:
         """
         Detect reflected XSS by checking if payload appears unencoded.
 
         Args:
-            response: HTTP response text
-            payload: Injected payload
+            response: Raw HTTP response body
+            payload: Injected payload, as text or already-encoded bytes
 
         Returns:
             True if payload found unencoded in response
         """
         if not response or not payload:
             return False
-        return payload in response
+        if isinstance(payload, str):
+            payload = payload.encode()
+        return response.find(payload) != -1
 
     @staticmethod
     def analyze_response(
-        response: str,
+        response: bytes,
         injected_payload: str,
         scan_type: str = "all"
     ) -> List[str]:
@@ -78,7 +168,7 @@ class VulnerabilityAnalyzer:
         Analyze response for multiple vulnerability types.
 
         Args:
-            response: HTTP response text
+            response: Raw HTTP response body
             injected_payload: The payload that was injected
             scan_type: Type of scan to perform ('sqli', 'xss', 'all')
 
@@ -114,6 +204,10 @@ class SQLInjectionScanner:
         """
         Scan a form for SQL injection vulnerabilities.
 
+        Error-based and boolean probes are sent concurrently, each distinct
+        payload once. After the first error-based hit, error probes are
+        skipped if they have not been sent yet; the boolean pair always runs.
+
         Args:
             url: Base URL
             form: Form dictionary
@@ -124,18 +218,47 @@ class SQLInjectionScanner:
         """
         results = []
         endpoint = form.get("action", url)
+        responses = {}
+        error_found = threading.Event()
+        fire = injector.bind(url, form)
+
+        def still_needed(payload: str) -> bool:
+            # Checked by the worker right before the request goes out
+            return payload in _BOOLEAN_PROBES or not error_found.is_set()
+
+        with ThreadPoolExecutor(max_workers=len(_SQLI_FORM_PROBES)) as executor:
+            futures = {
+                executor.submit(
+                    fire,
+                    payload,
+                    functools.partial(still_needed, payload),
+                    _PROBE_MAX_SIZES.get(payload)
+                ): payload
+                for payload in _SQLI_FORM_PROBES
+            }
+
+            for future in as_completed(futures):
+                resp = future.result()
+                if resp is None:  # Skipped after an earlier hit
+                    continue
 
-        # Error-based SQLi
-        for payload in SQLI_PAYLOADS:
-            resp = injector.inject(url, form, payload)
-            if self.analyzer.detect_sqli_error(resp):
-                results.append(("SQL Injection", endpoint, payload))
-                logger.info(f"SQL Injection (error-based) detected at {endpoint}")
-                break  # Found vulnerability, no need to test more
+                payload = futures[future]
+                responses[payload] = resp
+
+                # Error-based SQLi
+                if (
+                    not error_found.is_set()
+                    and payload in SQLI_PAYLOADS
+                    and self.analyzer.detect_sqli_error(resp)
+                ):
+                    # Found vulnerability, no need to test more
+                    error_found.set()
+                    results.append(("SQL Injection", endpoint, payload))
+                    logger.info(f"SQL Injection (error-based) detected at {endpoint}")
 
         # Boolean-based SQLi
-        resp_true = injector.inject(url, form, "' OR 1=1--")
-        resp_false = injector.inject(url, form, "' OR 1=2--")
+        resp_true = responses[_BOOLEAN_TRUE]
+        resp_false = responses[_BOOLEAN_FALSE]
 
         if self.analyzer.detect_sqli_boolean(resp_true, resp_false):
             results.append(("Blind SQL Injection", endpoint, "Boolean Based"))
@@ -171,9 +294,11 @@ class XSSScanner:
         results = []
         endpoint = form.get("action", url)
 
-        for payload in XSS_PAYLOADS:
-            resp = injector.inject(url, form, payload)
-            if self.analyzer.detect_xss_reflected(resp, payload):
+        fire = injector.bind(url, form)
+
+        for payload, payload_bytes in _XSS_FORM_PROBES:
+            resp = fire(payload)
+            if self.analyzer.detect_xss_reflected(resp, payload_bytes):
                 results.append(("Reflected XSS", endpoint, payload))
                 logger.info(f"Reflected XSS detected at {endpoint}")
                 break  # Found vulnerability, no need to test more
@@ -181,6 +306,176 @@ class XSSScanner:
         return results
 
 
+class FormFindings:
+    """Accumulates CombinedScanner findings for one form as responses arrive"""
+
+    def __init__(self, analyzer: VulnerabilityAnalyzer, endpoint: str):
+        """
+        Initialize an empty set of findings.
+
+        Args:
+            analyzer: VulnerabilityAnalyzer instance
+            endpoint: Form action reported with each finding
+        """
+        self.analyzer = analyzer
+        self.endpoint = endpoint
+        self.responses = {}
+        self.sqli_results = []
+        self.xss_results = []
+
+    def record(self, payload: str, resp: bytes) -> None:
+        """Run both detectors on the response to one probe"""
+        self.responses[payload] = resp
+
+        # Error-based SQLi
+        if not self.sqli_results and self.analyzer.detect_sqli_error(resp):
+            self.sqli_results.append(("SQL Injection", self.endpoint, payload))
+            logger.info(f"SQL Injection (error-based) detected at {self.endpoint}")
+
+        # Reflected XSS
+        payload_bytes = _XSS_PAYLOAD_BYTES.get(payload)
+        if (
+            payload_bytes is not None
+            and not self.xss_results
+            and self.analyzer.detect_xss_reflected(resp, payload_bytes)
+        ):
+            self.xss_results.append(("Reflected XSS", self.endpoint, payload))
+            logger.info(f"Reflected XSS detected at {self.endpoint}")
+
+    def still_needed(self, payload: str) -> bool:
+        """Whether a probe not yet answered can still add a finding"""
+        if payload in _BOOLEAN_PROBES or not self.sqli_results:
+            return True
+        return payload in _XSS_PAYLOAD_BYTES and not self.xss_results
+
+    def results(self) -> List[Tuple[str, str, str]]:
+        """Add the boolean-based verdict and return all findings"""
+        resp_true = self.responses[_BOOLEAN_TRUE]
+        resp_false = self.responses[_BOOLEAN_FALSE]
+
+        if self.analyzer.detect_sqli_boolean(resp_true, resp_false):
+            self.sqli_results.append(("Blind SQL Injection", self.endpoint, "Boolean Based"))
+            logger.info(f"Blind SQL Injection (boolean-based) detected at {self.endpoint}")
+
+        return self.sqli_results + self.xss_results
+
+
+class CombinedScanner:
+    """Scans a form for SQL injection and XSS with one request per payload"""
+
+    # Every distinct payload a form is probed with
+    payloads = _COMBINED_FORM_PROBES
+
+    def __init__(self, analyzer: VulnerabilityAnalyzer = None):
+        """
+        Initialize combined scanner.
+
+        Args:
+            analyzer: VulnerabilityAnalyzer instance
+        """
+        self.analyzer = analyzer or VulnerabilityAnalyzer()
+
+    @staticmethod
+    def max_size(payload: str) -> Optional[int]:
+        """Response bytes to read for a probe, or None for the injector's default"""
+        return _PROBE_MAX_SIZES.get(payload)
+
+    def new_findings(self, url: str, form: Dict) -> FormFindings:
+        """
+        Start collecting findings for one form, for callers that send the
+        probes themselves.
+
+        Args:
+            url: Base URL
+            form: Form dictionary
+
+        Returns:
+            Empty FormFindings for the form's endpoint
+        """
+        return FormFindings(self.analyzer, form.get("action", url))
+
+    def scan_form(self, url: str, form: Dict, injector) -> List[Tuple[str, str, str]]:
+        """
+        Scan a form for SQL injection and XSS vulnerabilities.
+
+        Finds the same issues as SQLInjectionScanner and XSSScanner together,
+        but every distinct payload is injected once and each response goes
+        through both detectors. Every response is checked for SQL errors;
+        only XSS payloads are checked for reflection. Right before it is
+        sent, each probe checks that it can still produce a new finding and
+        is skipped otherwise.
+
+        Args:
+            url: Base URL
+            form: Form dictionary
+            injector: PayloadInjector instance
+
+        Returns:
+            List of (vulnerability_type, endpoint, payload) tuples
+        """
+        findings = self.new_findings(url, form)
+        fire = injector.bind(url, form)
+
+        with ThreadPoolExecutor(max_workers=len(self.payloads)) as executor:
+            futures = {
+                executor.submit(
+                    fire,
+                    payload,
+                    functools.partial(findings.still_needed, payload),
+                    self.max_size(payload)
+                ): payload
+                for payload in self.payloads
+            }
+
+            for future in as_completed(futures):
+                resp = future.result()
+                if resp is not None:  # None: skipped, no longer needed
+                    findings.record(futures[future], resp)
+
+        return findings.results()
+
+    async def scan_form_async(self, url: str, form: Dict, injector) -> List[Tuple[str, str, str]]:
+        """
+        Scan a form like scan_form, with all probes in flight on the event loop.
+
+        Probes that can no longer produce a finding are cancelled, whether
+        still waiting for a send slot or in flight, unless another caller
+        awaits the same shared request.
+
+        Args:
+            url: Base URL
+            form: Form dictionary
+            injector: AsyncPayloadInjector instance
+
+        Returns:
+            List of (vulnerability_type, endpoint, payload) tuples
+        """
+        findings = self.new_findings(url, form)
+        fire = injector.bind(url, form)
+
+        tasks = {
+            asyncio.ensure_future(fire(payload, self.max_size(payload))): payload
+            for payload in self.payloads
+        }
+        pending = set(tasks)
+
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    findings.record(tasks[task], task.result())
+
+                for task in [t for t in pending if not findings.still_needed(tasks[t])]:
+                    task.cancel()
+                    pending.discard(task)
+        finally:
+            # Nothing is left running if a probe raised or this scan was cancelled
+            for task in pending:
+                task.cancel()
+
+        return findings.results()
+
+
 class ParameterScanner:
     """Scanner for URL parameter vulnerabilities"""
 
@@ -193,49 +488,106 @@ class ParameterScanner:
         """
         self.analyzer = analyzer or VulnerabilityAnalyzer()
 
-    def scan_url_parameters(self, url: str, injector) -> List[Tuple[str, str, str]]:
+    @staticmethod
+    def probe_urls(
+        url: str,
+        claim: Optional[Callable[[Tuple], bool]] = None
+    ) -> Iterator[Tuple[str, str, str]]:
+        """
+        Generate one probe URL per (parameter, payload) pair.
+
+        Args:
+            url: URL with parameters
+            claim: Called with (path, parameter, payload) before each probe;
+                the probe is skipped when it returns False (already sent)
+
+        Yields:
+            (probe URL, payload, vulnerability type reported on reflection)
+        """
+        parsed = urlparse(url)
+        query_items = parse_qsl(parsed.query, keep_blank_values=True)
+
+        # Everything but the query is the same for every probe
+        url_prefix = urlunparse(parsed._replace(query="", fragment="")) + "?"
+
+        for index, (key, value) in enumerate(query_items):
+            for payload, vuln_type in _PARAM_PROBES:
+                if claim is not None and not claim((parsed.path, key, payload)):
+                    continue
+
+                # Swap in the payload for this one parameter only
+                query_items[index] = (key, payload)
+                yield url_prefix + urlencode(query_items), payload, vuln_type
+
+            query_items[index] = (key, value)
+
+    @staticmethod
+    def check_probe(
+        url: str,
+        payload: str,
+        vuln_type: str,
+        body: bytes
+    ) -> List[Tuple[str, str, str]]:
+        """Return the findings for one parameter probe response"""
+        results = []
+
+        if payload.encode() in body:
+            results.append((vuln_type, url, payload))
+
+        if _SQL_HINT_RE.search(body):
+            results.append(("SQL Injection", url, payload))
+
+        return results
+
+    def scan_url_parameters(
+        self,
+        url: str,
+        injector,
+        claim: Optional[Callable[[Tuple], bool]] = None
+    ) -> List[Tuple[str, str, str]]:
         """
         Scan URL parameters for vulnerabilities.
 
         Args:
             url: URL with parameters
             injector: PayloadInjector instance
+            claim: Optional probe filter, see probe_urls
 
         Returns:
             List of (vulnerability_type, endpoint, payload) tuples
         """
-        from urllib.parse import urlparse, parse_qs, urlencode, urlunparse
-
         results = []
-        parsed = urlparse(url)
-        params = parse_qs(parsed.query)
 
-        if not params:
-            return results
+        for new_url, payload, vuln_type in self.probe_urls(url, claim):
+            body = injector.probe(new_url)
+            results.extend(self.check_probe(url, payload, vuln_type, body))
 
-        for key in params:
-            for payload in ["' OR 1=1--", "<script>alert(1)</script>"]:
-                try:
-                    new_params = params.copy()
-                    new_params[key] = [payload]  # parse_qs returns lists
-                    new_query = urlencode(new_params, doseq=True)
-                    new_url = urlunparse(parsed._replace(query=new_query))
+        return results
 
-                    import requests
-                    response = requests.get(new_url, timeout=5)
+    async def scan_url_parameters_async(
+        self,
+        url: str,
+        injector,
+        claim: Optional[Callable[[Tuple], bool]] = None
+    ) -> List[Tuple[str, str, str]]:
+        """
+        Scan URL parameters like scan_url_parameters, all probes concurrently.
 
-                    if payload in response.text:
-                        if "<script>" in payload:
-                            results.append(("Reflected XSS", url, payload))
-                        else:
-                            results.append(("SQL Injection", url, payload))
+        The probes still queue for the injector's per-host send slots.
 
-                    if "sql" in response.text.lower() or "mysql" in response.text.lower():
-                        results.append(("SQL Injection", url, payload))
+        Args:
+            url: URL with parameters
+            injector: AsyncPayloadInjector instance
+            claim: Optional probe filter, see probe_urls
 
-                except Exception as e:
-                    logger.debug(f"Error scanning parameter {key}: {e}")
-                    continue
+        Returns:
+            List of (vulnerability_type, endpoint, payload) tuples
+        """
+        probes = list(self.probe_urls(url, claim))
+        bodies = await asyncio.gather(*(injector.probe(new_url) for new_url, _, _ in probes))
 
-        return results
+        results = []
+        for (_, payload, vuln_type), body in zip(probes, bodies):
+            results.extend(self.check_probe(url, payload, vuln_type, body))
 
+        return results
@@ -1,11 +1,11 @@
-import requests
 from bs4 import BeautifulSoup
+from core.session import session
 
 def extract_forms(url):
     forms = []
 
     try:
-        response = requests.get(url)
+        response = session.get(url)
         soup = BeautifulSoup(response.text, "lxml")
 
         for form in soup.find_all("form"):
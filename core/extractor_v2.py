@@ -3,46 +3,92 @@ HTML form extraction and analysis module.
 Extracts form metadata for vulnerability testing.
 """
 import logging
-from typing import Dict, List
+from typing import Dict, List, Optional
 import requests
-from bs4 import BeautifulSoup
+from lxml import etree, html as lxml_html
+
+from core.http_utils import create_session
+
+try:
+    # Lexbor-backed parser; faster than lxml when only tags and attributes are read
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:  # Optional: fall back to lxml
+    LexborHTMLParser = None
 
 logger = logging.getLogger(__name__)
 
+# Precompiled element queries, evaluated by lxml in C
+_XPATHS = {
+    tag: etree.XPath(f".//{tag}")
+    for tag in ("input", "textarea", "select", "option")
+}
+_XPATHS["form"] = etree.XPath("//form")
+
+
+def _select(element, tag: str) -> List:
+    """Return descendant elements of element with the given tag"""
+    if LexborHTMLParser is not None:
+        return element.css(tag)
+    return _XPATHS[tag](element)
+
+
+def _attr(element, name: str, default=None):
+    """Return an attribute value, or default if absent or valueless"""
+    if LexborHTMLParser is not None:
+        value = element.attributes.get(name)
+        return default if value is None else value
+    return element.get(name, default)
+
+
+def _text(element) -> str:
+    """Return the text content of an element"""
+    if LexborHTMLParser is not None:
+        return element.text()
+    return element.text_content()
+
 
 class FormExtractor:
     """Extracts HTML form metadata from web pages"""
 
-    def __init__(self, timeout: int = 5):
+    def __init__(self, timeout: int = 5, session: Optional[requests.Session] = None):
         """
         Initialize form extractor.
 
         Args:
             timeout: HTTP request timeout in seconds
+            session: Existing session to reuse; a pooled one is created if omitted
         """
         self.timeout = timeout
 
-    def extract_forms(self, url: str) -> List[Dict[str, any]]:
+        if session is not None:
+            self.session = session
+            return
+
+        # Keep-alive session shared by all scanner threads
+        self.session = create_session()
+
+    def close(self) -> None:
+        """Close pooled HTTP connections"""
+        self.session.close()
+
+    def extract_forms(self, url: str, html: Optional[bytes] = None) -> List[Dict[str, any]]:
         """
         Extract all forms from a URL.
 
         Args:
             url: URL to extract forms from
+            html: Page body if it was already downloaded; skips the request
 
         Returns:
             List of form dictionaries with action, method, and inputs
         """
-        forms = []
+        if html is not None:
+            return self.parse_forms(url, html)
 
         try:
-            response = requests.get(url, timeout=self.timeout)
+            response = self.session.get(url, timeout=self.timeout)
             response.raise_for_status()
-            soup = BeautifulSoup(response.text, "lxml")
-
-            for idx, form in enumerate(soup.find_all("form")):
-                form_data = self._parse_form(form, url, idx)
-                if form_data:
-                    forms.append(form_data)
+            return self.parse_forms(url, response.content)
 
         except requests.exceptions.Timeout:
             logger.warning(f"Timeout extracting forms from {url}")
@@ -51,6 +97,38 @@ class FormExtractor:
         except Exception as e:
             logger.error(f"Unexpected error extracting forms: {e}")
 
+        return []
+
+    def parse_forms(self, url: str, content: bytes) -> List[Dict[str, any]]:
+        """
+        Extract all forms from an already downloaded page.
+
+        Args:
+            url: URL the page was fetched from
+            content: Raw page bytes
+
+        Returns:
+            List of form dictionaries with action, method, and inputs
+        """
+        forms = []
+
+        try:
+            # Parse the raw bytes; the parser handles charset detection itself
+            if LexborHTMLParser is not None:
+                document = LexborHTMLParser(content)
+            else:
+                document = lxml_html.fromstring(content)
+
+            for idx, form in enumerate(_select(document, "form")):
+                form_data = self._parse_form(form, url, idx)
+                if form_data:
+                    forms.append(form_data)
+
+        except etree.ParserError as e:
+            logger.debug(f"No parsable HTML at {url}: {e}")
+        except Exception as e:
+            logger.error(f"Unexpected error extracting forms: {e}")
+
         return forms
 
     @staticmethod
@@ -59,7 +137,7 @@ class FormExtractor:
         Parse a single form element.
 
         Args:
-            form: BeautifulSoup form element
+            form: Parsed form element (selectolax node or lxml element)
             base_url: Base URL for resolving relative actions
             form_index: Index of form on page
 
@@ -69,38 +147,41 @@ class FormExtractor:
         try:
             form_data = {
                 "id": f"form_{form_index}",
-                "action": form.get("action") or "",
-                "method": form.get("method", "get").lower(),
+                "action": _attr(form, "action") or "",
+                "method": _attr(form, "method", "get").lower(),
                 "inputs": [],
                 "textareas": [],
                 "selects": []
             }
 
             # Extract input fields
-            for input_tag in form.find_all("input"):
-                name = input_tag.get("name")
-                input_type = input_tag.get("type", "text")
+            for input_tag in _select(form, "input"):
+                name = _attr(input_tag, "name")
+                input_type = _attr(input_tag, "type", "text")
                 if name:
                     form_data["inputs"].append({
                         "name": name,
                         "type": input_type,
-                        "value": input_tag.get("value", "")
+                        "value": _attr(input_tag, "value", "")
                     })
 
             # Extract textarea fields
-            for textarea in form.find_all("textarea"):
-                name = textarea.get("name")
+            for textarea in _select(form, "textarea"):
+                name = _attr(textarea, "name")
                 if name:
                     form_data["textareas"].append({
                         "name": name,
-                        "value": textarea.get_text("")
+                        "value": _text(textarea)
                     })
 
             # Extract select fields
-            for select in form.find_all("select"):
-                name = select.get("name")
+            for select in _select(form, "select"):
+                name = _attr(select, "name")
                 if name:
-                    options = [opt.get("value", opt.get_text()) for opt in select.find_all("option")]
+                    options = [
+                        _attr(opt, "value", _text(opt))
+                        for opt in _select(select, "option")
+                    ]
                     form_data["selects"].append({
                         "name": name,
                         "options": options
@@ -139,9 +220,10 @@ class FormExtractor:
         Returns:
             Filtered list of forms
         """
-        if form_type.lower() == "all":
+        form_type = form_type.lower()
+        if form_type == "all":
             return forms
-        return [f for f in forms if f.get("method", "get").lower() == form_type.lower()]
+        return [f for f in forms if f.get("method", "get").lower() == form_type]
 
     def has_vulnerable_inputs(self, form: Dict[str, any]) -> bool:
         """
@@ -0,0 +1,89 @@
+"""
+Shared HTTP helpers: pooled session construction and size-capped body reads.
+"""
+from typing import AsyncIterator, Callable, Optional
+import requests
+from requests.adapters import HTTPAdapter
+
+from config import THREADS, USER_AGENT
+
+# Bytes requested per read while streaming a response body
+CHUNK_SIZE = 16384
+
+# Bytes before each new chunk that read_capped's stop callback also sees,
+# so a signature split across two chunks is still found
+STOP_OVERLAP = 256
+
+
+def create_session(
+    pool_connections: int = THREADS,
+    pool_maxsize: int = THREADS * 4,
+    max_retries=0
+) -> requests.Session:
+    """
+    Create a keep-alive session with the scanner's User-Agent.
+
+    Args:
+        pool_connections: Number of per-host connection pools to cache
+        pool_maxsize: Connections kept open per host
+        max_retries: Retry count or urllib3 Retry passed to the adapter
+
+    Returns:
+        Session with the pooled adapter mounted for http and https
+    """
+    session = requests.Session()
+    session.headers.update({"User-Agent": USER_AGENT})
+    adapter = HTTPAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        max_retries=max_retries
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def read_capped(
+    response: requests.Response,
+    limit: int,
+    stop: Optional[Callable[[bytes], bool]] = None
+) -> bytes:
+    """
+    Read a streamed (stream=True) response body, keeping at most limit bytes.
+
+    Args:
+        response: Response whose body has not been consumed yet
+        limit: Maximum number of bytes to keep
+        stop: Called after each chunk with that chunk plus the STOP_OVERLAP
+            bytes before it; reading ends early once it returns True.
+            Matches up to STOP_OVERLAP + 1 bytes long are always seen.
+
+    Returns:
+        Raw (possibly truncated) body
+    """
+    body = bytearray()
+    for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+        start = max(0, len(body) - STOP_OVERLAP)
+        body += chunk
+        if len(body) >= limit or (stop is not None and stop(bytes(body[start:]))):
+            break
+    return bytes(body[:limit])
+
+
+async def read_capped_async(chunks: AsyncIterator[bytes], limit: int) -> bytes:
+    """
+    Read an async body stream (aiohttp or httpx), keeping at most limit bytes.
+
+    Args:
+        chunks: Async iterator over body chunks
+        limit: Maximum number of bytes to keep
+
+    Returns:
+        Raw (possibly truncated) body
+    """
+    body = bytearray()
+    async for chunk in chunks:
+        body += chunk
+        if len(body) >= limit:
+            break
+    return bytes(body[:limit])
@@ -1,20 +1,33 @@
-import requests
-from urllib.parse import urljoin
+import time
+from urllib.parse import urljoin, urlparse
+from config import MAX_RESPONSE_SIZE
 from core.rate_limiter import apply_rate_limit
+from core.http_utils import read_capped
+from core.session import session
 
-def inject(url, form, payload):
-    apply_rate_limit()
+def inject(url, form, payload, stop=None, limit=MAX_RESPONSE_SIZE):
+    return timed_inject(url, form, payload, stop, limit)[0]
 
+# Also returns the seconds the request itself took, timed from when the
+# rate-limit slot was granted so queueing behind other probes is not counted
+def timed_inject(url, form, payload, stop=None, limit=MAX_RESPONSE_SIZE):
     target = urljoin(url, form["action"])
+    apply_rate_limit(urlparse(target).netloc)
+
     data = {name: payload for name in form["inputs"]}
+    t0 = time.perf_counter()
 
     try:
         if form["method"] == "post":
-            r = requests.post(target, data=data, timeout=5)
+            r = session.post(target, data=data, timeout=5, stream=True)
         else:
-            r = requests.get(target, params=data, timeout=5)
+            r = session.get(target, params=data, timeout=5, stream=True)
 
-        return r.text
+        # Read at most limit bytes, and stop early once stop(body) is true
+        with r:
+            body = read_capped(r, limit, stop)
 
     except Exception:
-        return ""
\ No newline at end of file
+        body = b""
+
+    return body, time.perf_counter() - t0
\ No newline at end of file
@@ -0,0 +1,314 @@
+"""
+Asynchronous payload injection module.
+Sends probes from a single event loop with aiohttp instead of a thread per URL.
+"""
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, Optional, Sequence, Tuple
+from urllib.parse import urlencode, urljoin, urlparse
+
+from config import RATE_LIMIT_DELAY, THREADS, USER_AGENT, MAX_RESPONSE_SIZE
+from core.http_utils import CHUNK_SIZE, read_capped_async
+
+try:
+    import aiohttp
+except ImportError:  # Optional: callers fall back to the threaded PayloadInjector
+    aiohttp = None
+
+try:
+    # HTTP/2 client: all probes to a host multiplex over one connection
+    import httpx
+    import h2  # noqa: F401  (required by httpx for http2=True)
+except ImportError:  # Optional: aiohttp (HTTP/1.1) is used instead
+    httpx = None
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncPayloadInjector:
+    """Injects payloads concurrently on one event loop with rate limiting"""
+
+    def __init__(
+        self,
+        rate_limit_delay: float = RATE_LIMIT_DELAY,
+        timeout: int = 5,
+        max_connections: int = THREADS,
+        max_response_size: int = MAX_RESPONSE_SIZE,
+        http2: bool = True
+    ):
+        """
+        Initialize the injector. The HTTP session is opened by `async with`.
+
+        Args:
+            rate_limit_delay: Delay between requests in seconds
+            timeout: HTTP request timeout in seconds
+            max_connections: Open connections allowed per host
+            max_response_size: Bytes of each response kept for detection
+            http2: Use httpx with HTTP/2 when it is installed; servers that
+                do not negotiate HTTP/2 are spoken to over HTTP/1.1
+        """
+        self.rate_limit_delay = rate_limit_delay
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.max_response_size = max_response_size
+        self.http2 = http2 and httpx is not None
+        self.session = None
+
+        # Loop time of the next free send slot per host, and the lock senders
+        # to that host queue on; only touched from the loop
+        self._next_allowed: Dict[str, float] = {}
+        self._rate_locks: Dict[str, asyncio.Lock] = {}
+
+        # Identical probes share one request: (method, target, data) -> task,
+        # with the number of callers currently awaiting it
+        self._probes: Dict[Tuple, asyncio.Task] = {}
+        self._waiters: Dict[Tuple, int] = {}
+
+    async def __aenter__(self):
+        if self.http2:
+            self.session = httpx.AsyncClient(
+                http2=True,
+                headers={"User-Agent": USER_AGENT},
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections * 4,
+                    max_keepalive_connections=self.max_connections
+                )
+            )
+            return self
+
+        connector = aiohttp.TCPConnector(
+            limit=self.max_connections * 4,
+            limit_per_host=self.max_connections,
+            ttl_dns_cache=300
+        )
+        self.session = aiohttp.ClientSession(
+            connector=connector,
+            headers={"User-Agent": USER_AGENT},
+            timeout=aiohttp.ClientTimeout(total=self.timeout)
+        )
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        # Shielded probes may outlive every caller; stop them before closing
+        for task in self._probes.values():
+            task.cancel()
+        await asyncio.gather(*self._probes.values(), return_exceptions=True)
+        self._probes.clear()
+        self._waiters.clear()
+
+        if self.http2:
+            await self.session.aclose()
+        else:
+            await self.session.close()
+        self.session = None
+
+    async def apply_rate_limit(self, host: str = "") -> None:
+        """
+        Wait for the host's next send slot, spacing its requests rate_limit_delay apart.
+
+        Senders queue on a per-host lock and the slot is only taken once the
+        wait is over, so a probe cancelled while waiting leaves no gap.
+
+        Args:
+            host: Network location (host[:port]) the request goes to
+        """
+        lock = self._rate_locks.get(host)
+        if lock is None:
+            lock = self._rate_locks[host] = asyncio.Lock()
+
+        async with lock:
+            loop = asyncio.get_running_loop()
+            wait = self._next_allowed.get(host, 0.0) - loop.time()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            self._next_allowed[host] = loop.time() + self.rate_limit_delay
+
+    async def fetch(
+        self,
+        url: str,
+        method: str = "get",
+        data: Optional[Sequence[Tuple[str, str]]] = None,
+        max_size: Optional[int] = None,
+        raise_for_status: bool = False
+    ) -> bytes:
+        """
+        Send one request and read at most max_size bytes of the body.
+
+        Args:
+            url: Absolute URL to request
+            method: 'get' (data sent as query) or 'post' (data sent as form)
+            data: (field name, value) pairs
+            max_size: Body bytes to keep (defaults to max_response_size)
+            raise_for_status: Treat non-2xx responses as failures
+
+        Returns:
+            Raw (possibly truncated) response body or empty bytes on failure
+        """
+        max_size = max_size or self.max_response_size
+
+        if self.http2:
+            return await self._fetch_http2(url, method, data, max_size, raise_for_status)
+
+        kwargs = {"data": data} if method == "post" else {"params": data}
+
+        try:
+            async with self.session.request(
+                method.upper(),
+                url,
+                raise_for_status=raise_for_status,
+                **kwargs
+            ) as response:
+                body = await read_capped_async(response.content.iter_chunked(CHUNK_SIZE), max_size)
+
+            logger.debug(f"Request to {url} returned status {response.status}")
+            return body
+
+        except asyncio.TimeoutError:
+            logger.warning(f"Timeout requesting {url}")
+            return b""
+        except aiohttp.ClientError as e:
+            logger.warning(f"Error requesting {url}: {e}")
+            return b""
+        except Exception as e:
+            logger.error(f"Error requesting {url}: {e}")
+            return b""
+
+    async def _fetch_http2(
+        self,
+        url: str,
+        method: str,
+        data: Optional[Sequence[Tuple[str, str]]],
+        max_size: int,
+        raise_for_status: bool
+    ) -> bytes:
+        """fetch() over the httpx client; see fetch for arguments"""
+        if method == "post":
+            kwargs = {
+                "content": urlencode(data or ()),
+                "headers": {"Content-Type": "application/x-www-form-urlencoded"}
+            }
+        else:
+            kwargs = {"params": data}
+
+        try:
+            async with self.session.stream(method.upper(), url, **kwargs) as response:
+                if raise_for_status:
+                    response.raise_for_status()
+                body = await read_capped_async(response.aiter_bytes(CHUNK_SIZE), max_size)
+
+            logger.debug(
+                f"Request to {url} returned status {response.status_code} ({response.http_version})"
+            )
+            return body
+
+        except httpx.TimeoutException:
+            logger.warning(f"Timeout requesting {url}")
+            return b""
+        except httpx.HTTPError as e:
+            logger.warning(f"Error requesting {url}: {e}")
+            return b""
+        except Exception as e:  # e.g. httpx.InvalidURL, which is not an HTTPError
+            logger.error(f"Error requesting {url}: {e}")
+            return b""
+
+    async def _send(
+        self,
+        method: str,
+        target: str,
+        data: Tuple[Tuple[str, str], ...],
+        max_size: Optional[int] = None
+    ) -> bytes:
+        """Send one rate-limited injection request"""
+        await self.apply_rate_limit(urlparse(target).netloc)
+        return await self.fetch(target, method, data, max_size)
+
+    async def probe(self, url: str) -> bytes:
+        """
+        Send one rate-limited GET to a ready-made URL, e.g. a parameter probe.
+
+        Args:
+            url: Absolute URL with the payload already in its query
+
+        Returns:
+            Raw (possibly truncated) response body or empty bytes on failure
+        """
+        await self.apply_rate_limit(urlparse(url).netloc)
+        return await self.fetch(url)
+
+    def bind(
+        self,
+        url: str,
+        form: Dict[str, any],
+        method: Optional[str] = None
+    ) -> Callable[..., Awaitable[bytes]]:
+        """
+        Prepare a rate-limited injection coroutine function for one form.
+
+        Probes are memoized per injector: a payload already sent to the same
+        target with the same fields awaits the existing request. Cancelling
+        a caller cancels the shared request only if no other caller is still
+        awaiting it.
+
+        Args:
+            url: Base URL for the form
+            form: Form dictionary with 'action', 'method', 'inputs'
+            method: Override form method (GET/POST)
+
+        Returns:
+            Coroutine function taking a payload and an optional max_size
+            (see fetch) and returning the raw response body, or empty bytes
+            on failure
+        """
+        target = urljoin(url, form.get("action", "")) or url
+
+        # Inputs are field dicts from FormExtractor or plain names
+        names = tuple(
+            inp["name"] if isinstance(inp, dict) else inp
+            for inp in form.get("inputs", [])
+        ) or ("input",)
+
+        form_method = (method or form.get("method", "get")).lower()
+
+        async def fire(payload: str, max_size: Optional[int] = None) -> bytes:
+            key = (form_method, target, tuple((name, payload) for name in names), max_size)
+            task = self._probes.get(key)
+            if task is None:
+                task = self._probes[key] = asyncio.ensure_future(self._send(*key))
+
+            self._waiters[key] = self._waiters.get(key, 0) + 1
+            try:
+                return await asyncio.shield(task)
+            except asyncio.CancelledError:
+                # Last caller gone: stop the request (or its wait for a send slot)
+                if self._waiters[key] == 1 and not task.done():
+                    task.cancel()
+                    del self._probes[key]
+                raise
+            finally:
+                self._waiters[key] -= 1
+                if not self._waiters[key]:
+                    del self._waiters[key]
+
+        return fire
+
+    async def inject(
+        self,
+        url: str,
+        form: Dict[str, any],
+        payload: str,
+        method: Optional[str] = None
+    ) -> bytes:
+        """
+        Inject payload into form and return response.
+
+        Args:
+            url: Base URL for the form
+            form: Form dictionary with 'action', 'method', 'inputs'
+            payload: Payload to inject into all inputs
+            method: Override form method (GET/POST)
+
+        Returns:
+            Raw response body or empty bytes on failure
+        """
+        return await self.bind(url, form, method)(payload)
@@ -2,39 +2,224 @@
 Enhanced payload injection and management module.
 Handles intelligent payload injection with proper error handling and logging.
 """
+import functools
 import logging
+import re
+import threading
 import time
-from typing import Dict, List, Optional, Tuple
-from urllib.parse import urljoin
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import urljoin, urlparse
 import requests
+from urllib3.util.retry import Retry
 
-from config import RATE_LIMIT_DELAY
+from config import RATE_LIMIT_DELAY, MAX_RESPONSE_SIZE
 from core.constants import SQLI_PAYLOADS, XSS_PAYLOADS
+from core.http_utils import create_session, read_capped
 
 logger = logging.getLogger(__name__)
 
+# (payload, vulnerability type) pairs, built once rather than per form
+_SQLI_PROBES = tuple((p, "SQL Injection") for p in SQLI_PAYLOADS)
+
+# Each XSS payload prefixed with its own canary; all are sent in one request
+# and one regex pass over the response finds which came back unencoded
+_XSS_TAGGED = tuple((f"zx{i:03d}{p}".encode(), p) for i, p in enumerate(XSS_PAYLOADS))
+_XSS_BATCH = b"".join(tagged for tagged, _ in _XSS_TAGGED).decode()
+_XSS_BATCH_RE = re.compile(b"|".join(re.escape(tagged) for tagged, _ in _XSS_TAGGED))
+
+# Memoized responses per injector: one form's probe set (SQL and XSS payloads,
+# the XSS batch and the boolean pair). Each body can be max_response_size
+# bytes, so a scan-wide cache would hold hundreds of MB.
+_SEND_CACHE_SIZE = len(SQLI_PAYLOADS) + len(XSS_PAYLOADS) + 3
+
+
+class _ProbeSkipped(Exception):
+    """Raised by _send when the caller no longer needs the probe (never cached)"""
+
 
 class PayloadInjector:
     """Handles payload injection with rate limiting and error handling"""
 
-    def __init__(self, rate_limit_delay: float = RATE_LIMIT_DELAY, timeout: int = 5):
+    def __init__(
+        self,
+        rate_limit_delay: float = RATE_LIMIT_DELAY,
+        timeout: int = 5,
+        max_response_size: int = MAX_RESPONSE_SIZE
+    ):
         """
         Initialize the injector.
 
         Args:
             rate_limit_delay: Delay between requests in seconds
             timeout: HTTP request timeout in seconds
+            max_response_size: Bytes of each response kept for detection
         """
         self.rate_limit_delay = rate_limit_delay
         self.timeout = timeout
-        self.last_request_time = 0
+        self.max_response_size = max_response_size
+
+        # Monotonic time of the next free send slot per host, shared by all threads
+        self._next_allowed: Dict[str, float] = {}
+        self._rate_lock = threading.Lock()
+
+        # needed() predicate of the probe the current thread is sending
+        self._local = threading.local()
+
+        # Keep-alive session shared by all scanner threads. One quick retry
+        # covers pooled connections the server closed while they sat idle.
+        self.session = create_session(max_retries=Retry(total=1, backoff_factor=0.1))
+
+        # Repeats of a recent probe (same method, target and data) are not resent
+        self._send_cached = functools.lru_cache(maxsize=_SEND_CACHE_SIZE)(self._send)
+
+    def close(self) -> None:
+        """Close pooled HTTP connections"""
+        self.session.close()
+
+    def apply_rate_limit(self, host: str = "") -> None:
+        """
+        Apply rate limiting to prevent overwhelming target server.
+
+        Each call reserves the next slot under the lock, then sleeps outside
+        the lock until that slot arrives, so concurrent probes to one host
+        are spaced rate_limit_delay apart instead of firing together.
+        Requests to different hosts do not wait for each other.
+
+        Args:
+            host: Network location (host[:port]) the request goes to
+        """
+        with self._rate_lock:
+            now = time.monotonic()
+            slot = max(now, self._next_allowed.get(host, 0.0))
+            self._next_allowed[host] = slot + self.rate_limit_delay
+
+        wait = slot - now
+        if wait > 0:
+            time.sleep(wait)
+
+    def _send(
+        self,
+        method: str,
+        target: str,
+        data: Tuple[Tuple[str, str], ...],
+        max_size: Optional[int] = None
+    ) -> bytes:
+        """
+        Send one rate-limited injection request.
+
+        The body is streamed and only the first max_response_size bytes are
+        read; error signatures and reflections show up early in the page.
+
+        Args:
+            method: 'get' or 'post'
+            target: Absolute URL to send the payload to
+            data: (field name, value) pairs
+            max_size: Body bytes to keep (defaults to max_response_size)
+
+        Returns:
+            Raw (possibly truncated) response body
+        """
+        # Checked before a send slot is reserved and again once it comes up:
+        # other responses may have made the probe pointless while it waited
+        self._check_needed()
+        self.apply_rate_limit(urlparse(target).netloc)
+        self._check_needed()
+
+        if method == "post":
+            response = self.session.post(target, data=data, timeout=self.timeout, stream=True)
+        else:
+            response = self.session.get(target, params=data, timeout=self.timeout, stream=True)
+
+        with response:
+            body = read_capped(response, max_size or self.max_response_size)
+
+        logger.debug(f"Injection to {target} returned status {response.status_code}")
+        return body
+
+    def probe(self, url: str) -> bytes:
+        """
+        Send one rate-limited GET to a ready-made URL, e.g. a parameter probe.
+
+        Args:
+            url: Absolute URL with the payload already in its query
+
+        Returns:
+            Raw (possibly truncated) response body or empty bytes on failure
+        """
+        try:
+            return self._send("get", url, ())
+        except Exception as e:
+            logger.debug(f"Error sending probe {url}: {e}")
+            return b""
+
+    def _check_needed(self) -> None:
+        """Raise _ProbeSkipped if the current probe's needed() returns False"""
+        needed = getattr(self._local, "needed", None)
+        if needed is not None and not needed():
+            raise _ProbeSkipped
+
+    def bind(
+        self,
+        url: str,
+        form: Dict[str, any],
+        method: Optional[str] = None
+    ) -> Callable[..., Optional[bytes]]:
+        """
+        Prepare an injection function for one form.
 
-    def apply_rate_limit(self) -> None:
-        """Apply rate limiting to prevent overwhelming target server"""
-        elapsed = time.time() - self.last_request_time
-        if elapsed < self.rate_limit_delay:
-            time.sleep(self.rate_limit_delay - elapsed)
-        self.last_request_time = time.time()
+        The target URL, method and field names are resolved once here; the
+        returned function only pairs each field with the payload and sends
+        it. Use it when a form is probed with many payloads.
+
+        Args:
+            url: Base URL for the form
+            form: Form dictionary with 'action', 'method', 'inputs'
+            method: Override form method (GET/POST)
+
+        Returns:
+            Function taking a payload, an optional needed() predicate and an
+            optional max_size, and returning the raw response body, empty
+            bytes on failure, or None if needed() returned False before the
+            request went out
+        """
+        # Construct target URL
+        target = urljoin(url, form.get("action", "")) or url
+
+        # Inputs are field dicts from FormExtractor or plain names
+        names = tuple(
+            inp["name"] if isinstance(inp, dict) else inp
+            for inp in form.get("inputs", [])
+        ) or ("input",)
+
+        # Determine method
+        form_method = (method or form.get("method", "get")).lower()
+
+        send = self._send_cached
+
+        def fire(
+            payload: str,
+            needed: Optional[Callable[[], bool]] = None,
+            max_size: Optional[int] = None
+        ) -> Optional[bytes]:
+            self._local.needed = needed
+            try:
+                data = tuple((name, payload) for name in names)
+                return send(form_method, target, data, max_size)
+            except _ProbeSkipped:
+                return None
+            except requests.exceptions.Timeout:
+                logger.warning(f"Timeout during payload injection to {url}")
+                return b""
+            except requests.exceptions.ConnectionError:
+                logger.warning(f"Connection error during payload injection to {url}")
+                return b""
+            except Exception as e:
+                logger.error(f"Error during payload injection: {e}")
+                return b""
+            finally:
+                self._local.needed = None
+
+        return fire
 
     def inject(
         self,
@@ -42,10 +227,13 @@ class PayloadInjector:
         form: Dict[str, any],
         payload: str,
         method: Optional[str] = None
-    ) -> str:
+    ) -> bytes:
         """
         Inject payload into form and return response.
 
+        Responses are memoized per injector, so repeating a probe already
+        sent during this scan costs no request.
+
         Args:
             url: Base URL for the form
             form: Form dictionary with 'action', 'method', 'inputs'
@@ -53,43 +241,15 @@ class PayloadInjector:
             method: Override form method (GET/POST)
 
         Returns:
-            Response text or empty string on failure
+            Raw response body or empty bytes on failure
         """
         try:
-            # Apply rate limiting
-            self.apply_rate_limit()
-
-            # Construct target URL
-            target = urljoin(url, form.get("action", ""))
-            if not target:
-                target = url
-
-            # Prepare data
-            data = {name: payload for name in form.get("inputs", [])}
-            if not data:
-                data = {"input": payload}
-
-            # Determine method
-            form_method = (method or form.get("method", "get")).lower()
-
-            # Execute request
-            if form_method == "post":
-                response = requests.post(target, data=data, timeout=self.timeout)
-            else:
-                response = requests.get(target, params=data, timeout=self.timeout)
-
-            logger.debug(f"Injection to {target} returned status {response.status_code}")
-            return response.text
-
-        except requests.exceptions.Timeout:
-            logger.warning(f"Timeout during payload injection to {url}")
-            return ""
-        except requests.exceptions.ConnectionError:
-            logger.warning(f"Connection error during payload injection to {url}")
-            return ""
+            fire = self.bind(url, form, method)
         except Exception as e:
             logger.error(f"Error during payload injection: {e}")
-            return ""
+            return b""
+
+        return fire(payload)
 
     def test_single_form(
         self,
@@ -100,6 +260,9 @@ class PayloadInjector:
         """
         Test a single form with appropriate payloads.
 
+        SQL payloads are sent one per request. The XSS payloads share a
+        single canary-tagged request.
+
         Args:
             url: Base URL
             form: Form to test
@@ -109,19 +272,22 @@ class PayloadInjector:
             List of (vulnerability_type, endpoint, payload) tuples
         """
         results = []
-        payloads_to_test = []
+        endpoint = form.get("action", url)
+        fire = self.bind(url, form)
 
         if scan_type in ("all", "sqli"):
-            payloads_to_test.extend([(p, "SQL Injection") for p in SQLI_PAYLOADS])
-        if scan_type in ("all", "xss"):
-            payloads_to_test.extend([(p, "Reflected XSS") for p in XSS_PAYLOADS])
+            for payload, vuln_type in _SQLI_PROBES:
+                response = fire(payload)
+                if response and payload.encode() in response:
+                    results.append((vuln_type, endpoint, payload))
+                    logger.info(f"Found {vuln_type} at {endpoint}")
 
-        for payload, vuln_type in payloads_to_test:
-            response = self.inject(url, form, payload)
-            if response and payload in response:
-                endpoint = form.get("action", url)
-                results.append((vuln_type, endpoint, payload))
-                logger.info(f"Found {vuln_type} at {endpoint}")
+        if scan_type in ("all", "xss"):
+            reflected = set(_XSS_BATCH_RE.findall(fire(_XSS_BATCH)))
+            for tagged, payload in _XSS_TAGGED:
+                if tagged in reflected:
+                    results.append(("Reflected XSS", endpoint, payload))
+                    logger.info(f"Found Reflected XSS at {endpoint}")
 
         return results
 
@@ -135,14 +301,31 @@ class BulkPayloadInjector(PayloadInjector):
         self.injection_count = 0
         self.error_count = 0
 
-    def inject(self, url: str, form: Dict, payload: str, method: Optional[str] = None) -> str:
-        """Override to track statistics"""
-        self.injection_count += 1
-        try:
-            return super().inject(url, form, payload, method)
-        except Exception:
-            self.error_count += 1
-            raise
+    def bind(
+        self,
+        url: str,
+        form: Dict,
+        method: Optional[str] = None
+    ) -> Callable[..., Optional[bytes]]:
+        """Override to track statistics (inject goes through bind too)"""
+        fire = super().bind(url, form, method)
+
+        def counted(
+            payload: str,
+            needed: Optional[Callable[[], bool]] = None,
+            max_size: Optional[int] = None
+        ) -> Optional[bytes]:
+            try:
+                resp = fire(payload, needed, max_size)
+            except Exception:
+                self.injection_count += 1
+                self.error_count += 1
+                raise
+            if resp is not None:
+                self.injection_count += 1
+            return resp
+
+        return counted
 
     def get_stats(self) -> Dict[str, int]:
         """Get injection statistics"""
@@ -1,5 +1,18 @@
+import threading
 import time
 from config import RATE_LIMIT_DELAY
 
-def apply_rate_limit():
-    time.sleep(RATE_LIMIT_DELAY)
\ No newline at end of file
+# Monotonic time of the next free send slot per host, shared by all scanner threads
+_next_allowed = {}
+_lock = threading.Lock()
+
+def apply_rate_limit(host=""):
+    # Reserve the slot under the lock and sleep outside it, so parallel
+    # probes to one host stay RATE_LIMIT_DELAY apart
+    with _lock:
+        now = time.monotonic()
+        slot = max(now, _next_allowed.get(host, 0.0))
+        _next_allowed[host] = slot + RATE_LIMIT_DELAY
+
+    if slot > now:
+        time.sleep(slot - now)
\ No newline at end of file
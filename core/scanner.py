@@ -1,13 +1,42 @@
-from concurrent.futures import ThreadPoolExecutor
-from urllib.parse import urlparse, parse_qs, urlencode, urlunparse
-import requests
+import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlparse, parse_qs, parse_qsl, urlencode, urlunparse
 
 from core.crawler import crawl
 from core.extractor import extract_forms
 from core.sqli import scan_sqli
 from core.xss import scan_xss
+from core.session import session
 from config import THREADS
 
+# Case-insensitive match on the raw body: no decode, no lowered copy
+_SQL_HINT_RE = re.compile(b"sql", re.IGNORECASE)
+
+def canonical_url(url):
+    parsed = urlparse(url)
+    query = urlencode(sorted(parse_qsl(parsed.query, keep_blank_values=True)))
+    return urlunparse(parsed._replace(
+        scheme=parsed.scheme.lower(),
+        netloc=parsed.netloc.lower(),
+        query=query,
+        fragment=""
+    ))
+
+
+def dedupe_urls(urls):
+    # Keep the first URL of each canonical form; the rest would scan the same page
+    seen = set()
+    unique = []
+
+    for url in urls:
+        key = canonical_url(url)
+        if key not in seen:
+            seen.add(key)
+            unique.append(url)
+
+    return unique
+
+
 def test_url_parameters(url):
     results = []
 
@@ -19,30 +48,36 @@ def test_url_parameters(url):
 
     for key in params:
         for payload in ["' OR 1=1--", "<script>alert(1)</script>"]:
+            original = params[key]
             try:
-                new_params = params.copy()
-                new_params[key] = payload
+                params[key] = payload
 
-                new_query = urlencode(new_params, doseq=True)
+                new_query = urlencode(params, doseq=True)
                 new_url = urlunparse(parsed._replace(query=new_query))
 
-                r = requests.get(new_url, timeout=5)
+                r = session.get(new_url, timeout=5)
+                body = r.content
 
-                if payload in r.text:
+                if payload.encode() in body:
                     results.append(("Reflected XSS", url, payload))
 
-                if "sql" in r.text.lower() or "mysql" in r.text.lower():
+                # "mysql" contains "sql", so one check covers both
+                if _SQL_HINT_RE.search(body):
                     results.append(("SQL Injection", url, payload))
 
             except Exception:
                 continue
+            finally:
+                params[key] = original
 
     return results
 
 
-def run_scan(target):
-    results = []
-    urls = crawl(target)
+def iter_scan(target):
+    urls = dedupe_urls(crawl(target))
+
+    # Time-based SQLi baselines, shared by this scan's threads only
+    baselines = {}
 
     def process(url):
         local_results = []
@@ -50,17 +85,20 @@ def run_scan(target):
         forms = extract_forms(url)
 
         for form in forms:
-            local_results.extend(scan_sqli(url, form))
+            local_results.extend(scan_sqli(url, form, baselines))
             local_results.extend(scan_xss(url, form))
 
         local_results.extend(test_url_parameters(url))
 
         return local_results
 
+    # Yield each URL's findings as soon as it finishes, in completion order
     with ThreadPoolExecutor(max_workers=THREADS) as executor:
-        futures = executor.map(process, urls)
+        futures = [executor.submit(process, url) for url in urls]
+
+        for future in as_completed(futures):
+            yield from future.result()
 
-        for result in futures:
-            results.extend(result)
 
-    return results
\ No newline at end of file
+def run_scan(target):
+    return list(iter_scan(target))
\ No newline at end of file
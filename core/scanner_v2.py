@@ -2,38 +2,66 @@
 Main vulnerability scanning orchestrator.
 Coordinates all scanning components for comprehensive vulnerability assessment.
 """
+import asyncio
+import functools
 import logging
-from typing import List, Dict, Tuple
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from typing import Callable, List, Dict, Optional, Set, Tuple
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime
+from operator import attrgetter
+from urllib.parse import urljoin, urlparse
 
 from core.crawler_v2 import WebCrawler
 from core.extractor_v2 import FormExtractor
 from core.injector_v2 import PayloadInjector
-from core.detectors_v2 import SQLInjectionScanner, XSSScanner, ParameterScanner
-from config import THREADS
+from core.injector_async import AsyncPayloadInjector, aiohttp, httpx
+from core.detectors_v2 import CombinedScanner, FormFindings, ParameterScanner
+from config import THREADS, MAX_PAGE_SIZE
 
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+# dataclass(slots=True) needs Python 3.10; older interpreters keep a __dict__
+_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+# Keys and getter used by VulnerabilityScanner.get_results
+_RESULT_KEYS = ("type", "endpoint", "payload", "timestamp")
+_RESULT_FIELDS = attrgetter("vulnerability_type", "endpoint", "payload", "timestamp")
+
+
+@dataclass(frozen=True, **_SLOTS)
 class ScanResult:
     """Data class for scan results"""
     vulnerability_type: str
     endpoint: str
     payload: str
-    timestamp: str = None
+    timestamp_ns: int = field(default_factory=time.time_ns)  # Epoch nanoseconds
 
-    def __post_init__(self):
-        if self.timestamp is None:
-            self.timestamp = datetime.now().isoformat()
+    @property
+    def timestamp(self) -> str:
+        """Detection time as an ISO 8601 string, formatted on demand"""
+        return datetime.fromtimestamp(self.timestamp_ns / 1e9).isoformat()
 
     def to_tuple(self) -> Tuple[str, str, str]:
         """Convert to tuple format for database storage"""
         return (self.vulnerability_type, self.endpoint, self.payload)
 
 
+@dataclass(frozen=True)
+class WorkUnit:
+    """A single probe request in a flattened scan"""
+    url: str
+    payload: str
+    form_key: Optional[str] = None  # Set for form probes
+    probe_url: Optional[str] = None  # Set for URL parameter probes
+    vuln_type: Optional[str] = None  # Reported when a parameter probe reflects
+
+
 class VulnerabilityScanner:
     """Main orchestrator for vulnerability scanning"""
 
@@ -54,16 +82,88 @@ class VulnerabilityScanner:
             rate_limit: Rate limit delay in seconds
         """
         self.max_threads = max_threads
-        self.crawler = WebCrawler(max_depth=max_crawl_depth, timeout=request_timeout)
-        self.extractor = FormExtractor(timeout=request_timeout)
         self.injector = PayloadInjector(rate_limit_delay=rate_limit, timeout=request_timeout)
-        self.sqli_scanner = SQLInjectionScanner()
-        self.xss_scanner = XSSScanner()
+
+        # Crawling, form fetches and probes all hit the same host: share one
+        # keep-alive pool so connections (and TLS sessions) are reused
+        shared_session = self.injector.session
+        self.crawler = WebCrawler(
+            max_depth=max_crawl_depth,
+            timeout=request_timeout,
+            session=shared_session,
+            page_handler=self._remember_page
+        )
+        self.extractor = FormExtractor(timeout=request_timeout, session=shared_session)
+        self.form_scanner = CombinedScanner()
         self.param_scanner = ParameterScanner()
 
         self.scan_results: List[ScanResult] = []
         self.discovered_urls: List[str] = []
 
+        # Probes already sent this scan. A form repeated across pages (a
+        # sitewide search box) or a parameter shared by many URLs is tested once.
+        self._probe_seen: Set[Tuple] = set()
+        self._probe_lock = threading.Lock()
+
+        # Forms of pages the crawler already downloaded, keyed by URL, so
+        # scanning does not fetch those pages a second time
+        self._page_forms: Dict[str, List[Dict]] = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self) -> None:
+        """Release HTTP connections held by the scanning components"""
+        self.crawler.close()
+        self.extractor.close()
+        self.injector.close()
+
+    def _remember_page(self, url: str, body: bytes) -> None:
+        """Crawler page handler: keep the forms of a fetched page"""
+        self._page_forms[url] = self.extractor.parse_forms(url, body)
+
+    def _get_forms(self, url: str) -> List[Dict]:
+        """Return the forms on a page, fetching it only if it was not crawled"""
+        forms = self._page_forms.get(url)
+        if forms is None:
+            forms = self.extractor.extract_forms(url)
+        return forms
+
+    def _claim_probe(self, key: Tuple) -> bool:
+        """
+        Mark a probe as sent for this scan.
+
+        Args:
+            key: Hashable probe identity
+
+        Returns:
+            True if the probe was not sent before and should be sent now
+        """
+        with self._probe_lock:
+            if key in self._probe_seen:
+                return False
+            self._probe_seen.add(key)
+            return True
+
+    def _claim_form(self, url: str, form: Dict) -> bool:
+        """
+        Claim all payload probes for a form, keyed by method, action path
+        and sorted field names.
+
+        Args:
+            url: Page the form was found on
+            form: Form dictionary
+
+        Returns:
+            True if no identical form was scanned before
+        """
+        path = urlparse(urljoin(url, form.get("action", ""))).path
+        names = tuple(sorted(inp["name"] for inp in form.get("inputs", [])))
+        return self._claim_probe((form.get("method", "get"), path, names))
+
     def _scan_single_url(self, url: str) -> List[ScanResult]:
         """
         Scan a single URL for vulnerabilities.
@@ -75,26 +175,23 @@ class VulnerabilityScanner:
             List of detected vulnerabilities
         """
         results = []
+        timestamp_ns = time.time_ns()
         logger.debug(f"Scanning URL: {url}")
 
         try:
             # Extract forms
-            forms = self.extractor.extract_forms(url)
+            forms = self._get_forms(url)
             logger.debug(f"Found {len(forms)} forms on {url}")
 
             # Scan each form
             for form in forms:
-                if not self.extractor.has_vulnerable_inputs(form):
+                if not self.extractor.has_vulnerable_inputs(form) or not self._claim_form(url, form):
                     continue
 
                 try:
-                    # SQL Injection scanning
-                    sqli_results = self.sqli_scanner.scan_form(url, form, self.injector)
-                    results.extend([ScanResult(*r) for r in sqli_results])
-
-                    # XSS scanning
-                    xss_results = self.xss_scanner.scan_form(url, form, self.injector)
-                    results.extend([ScanResult(*r) for r in xss_results])
+                    # SQL Injection and XSS scanning, one request per payload
+                    form_results = self.form_scanner.scan_form(url, form, self.injector)
+                    results.extend(ScanResult(*r, timestamp_ns) for r in form_results)
 
                 except Exception as e:
                     logger.warning(f"Error scanning form on {url}: {e}")
@@ -102,8 +199,10 @@ class VulnerabilityScanner:
 
             # Test URL parameters
             try:
-                param_results = self.param_scanner.scan_url_parameters(url, self.injector)
-                results.extend([ScanResult(*r) for r in param_results])
+                param_results = self.param_scanner.scan_url_parameters(
+                    url, self.injector, self._claim_probe
+                )
+                results.extend(ScanResult(*r, timestamp_ns) for r in param_results)
             except Exception as e:
                 logger.warning(f"Error scanning parameters on {url}: {e}")
 
@@ -112,10 +211,237 @@ class VulnerabilityScanner:
 
         return results
 
+    async def _scan_single_url_async(
+        self,
+        injector: AsyncPayloadInjector,
+        url: str
+    ) -> List[ScanResult]:
+        """
+        Scan a single URL for vulnerabilities on the event loop.
+
+        All forms on the page and the URL parameters are probed concurrently.
+
+        Args:
+            injector: Open AsyncPayloadInjector
+            url: URL to scan
+
+        Returns:
+            List of detected vulnerabilities
+        """
+        logger.debug(f"Scanning URL: {url}")
+
+        forms = self._page_forms.get(url)
+        if forms is None:
+            page = await injector.fetch(url, max_size=MAX_PAGE_SIZE, raise_for_status=True)
+            forms = self.extractor.parse_forms(url, page) if page else []
+        logger.debug(f"Found {len(forms)} forms on {url}")
+
+        scans = [
+            self.form_scanner.scan_form_async(url, form, injector)
+            for form in forms
+            if self.extractor.has_vulnerable_inputs(form) and self._claim_form(url, form)
+        ]
+        scans.append(self.param_scanner.scan_url_parameters_async(url, injector, self._claim_probe))
+
+        results = []
+        timestamp_ns = time.time_ns()
+        for outcome in await asyncio.gather(*scans, return_exceptions=True):
+            if isinstance(outcome, Exception):
+                logger.warning(f"Error scanning {url}: {outcome}")
+                continue
+            results.extend(ScanResult(*r, timestamp_ns) for r in outcome)
+
+        return results
+
+    async def _scan_all(self, urls: List[str]) -> List[ScanResult]:
+        """
+        Scan URLs concurrently on one event loop.
+
+        At most max_threads * 8 URLs are in progress at once; connections
+        and the rate limit are shared through one AsyncPayloadInjector.
+
+        Args:
+            urls: URLs to scan
+
+        Returns:
+            List of detected vulnerabilities
+        """
+        semaphore = asyncio.Semaphore(self.max_threads * 8)
+
+        async with AsyncPayloadInjector(
+            rate_limit_delay=self.injector.rate_limit_delay,
+            timeout=self.injector.timeout,
+            max_connections=self.max_threads
+        ) as injector:
+
+            async def scan_guarded(url: str) -> List[ScanResult]:
+                async with semaphore:
+                    return await self._scan_single_url_async(injector, url)
+
+            outcomes = await asyncio.gather(
+                *(scan_guarded(url) for url in urls),
+                return_exceptions=True
+            )
+
+        results = []
+        for url, outcome in zip(urls, outcomes):
+            if isinstance(outcome, Exception):
+                logger.error(f"Error processing {url}: {outcome}")
+                continue
+            results.extend(outcome)
+            if outcome:
+                logger.info(f"Found {len(outcome)} vulnerabilities on {url}")
+
+        return results
+
+    def _enumerate_work(self, url: str) -> Tuple[Dict[str, Dict], List[WorkUnit]]:
+        """
+        Extract forms from a URL and list every probe to send for it.
+
+        Args:
+            url: URL to scan
+
+        Returns:
+            (forms keyed by form_key, work units for the forms and parameters)
+        """
+        forms = {}
+        units = []
+
+        for form in self._get_forms(url):
+            if not self.extractor.has_vulnerable_inputs(form) or not self._claim_form(url, form):
+                continue
+
+            form_key = f"{url}#{form['id']}"
+            forms[form_key] = form
+            units.extend(
+                WorkUnit(url, payload, form_key=form_key)
+                for payload in self.form_scanner.payloads
+            )
+
+        for probe_url, payload, vuln_type in self.param_scanner.probe_urls(url, self._claim_probe):
+            units.append(WorkUnit(url, payload, probe_url=probe_url, vuln_type=vuln_type))
+
+        return forms, units
+
+    def _execute(
+        self,
+        unit: WorkUnit,
+        binds: Dict[str, Callable[..., Optional[bytes]]],
+        findings: Dict[str, FormFindings]
+    ) -> Optional[bytes]:
+        """
+        Send the request for one work unit.
+
+        Args:
+            unit: Work unit to run
+            binds: Bound injection functions keyed by form_key
+            findings: Findings so far keyed by form_key; a form probe is
+                skipped once they make it pointless
+
+        Returns:
+            Raw response body, empty bytes on failure, or None if skipped
+        """
+        if unit.form_key is not None:
+            needed = functools.partial(findings[unit.form_key].still_needed, unit.payload)
+            max_size = self.form_scanner.max_size(unit.payload)
+            return binds[unit.form_key](unit.payload, needed, max_size)
+
+        return self.injector.probe(unit.probe_url)
+
+    def _scan_all_threaded(self, urls: List[str]) -> List[ScanResult]:
+        """
+        Scan URLs on thread pools, scheduling one request at a time.
+
+        Pages are fetched first and every probe for every URL is flattened
+        into one list of work units, so a slow form never holds a worker
+        that could be sending other probes. Form probes that can no longer
+        add a finding are cancelled while queued and skipped if a worker
+        picks them up before the cancel lands.
+
+        Args:
+            urls: URLs to scan
+
+        Returns:
+            List of detected vulnerabilities
+        """
+        forms: Dict[str, Tuple[str, Dict]] = {}
+        units: List[WorkUnit] = []
+
+        # Stage 1: fetch each page once and enumerate its probes
+        with ThreadPoolExecutor(max_workers=self.max_threads) as executor:
+            futures = {executor.submit(self._enumerate_work, url): url for url in urls}
+            for future in as_completed(futures):
+                url = futures[future]
+                try:
+                    url_forms, url_units = future.result()
+                except Exception as e:
+                    logger.error(f"Error processing {url}: {e}")
+                    continue
+                forms.update((key, (url, form)) for key, form in url_forms.items())
+                units.extend(url_units)
+
+        findings = {
+            key: self.form_scanner.new_findings(url, form)
+            for key, (url, form) in forms.items()
+        }
+        binds = {key: self.injector.bind(url, form) for key, (url, form) in forms.items()}
+        param_results = defaultdict(list)
+
+        # Stage 2: one pool for all probes, sized to the injector's connection pool
+        with ThreadPoolExecutor(max_workers=self.max_threads * 4) as executor:
+            futures = {
+                executor.submit(self._execute, unit, binds, findings): unit
+                for unit in units
+            }
+
+            form_futures = defaultdict(list)
+            for future, unit in futures.items():
+                if unit.form_key is not None:
+                    form_futures[unit.form_key].append(future)
+
+            for future in as_completed(futures):
+                if future.cancelled():
+                    continue
+
+                unit = futures[future]
+                body = future.result()
+                if body is None:  # Skipped form probe
+                    continue
+
+                if unit.form_key is None:
+                    param_results[unit.url].extend(
+                        self.param_scanner.check_probe(unit.url, unit.payload, unit.vuln_type, body)
+                    )
+                    continue
+
+                form_findings = findings[unit.form_key]
+                form_findings.record(unit.payload, body)
+                for pending in form_futures[unit.form_key]:
+                    if not form_findings.still_needed(futures[pending].payload):
+                        pending.cancel()
+
+        url_results = defaultdict(list)
+        for key, (url, _) in forms.items():
+            url_results[url].extend(findings[key].results())
+
+        results = []
+        timestamp_ns = time.time_ns()
+        for url in urls:
+            found = url_results[url] + param_results[url]
+            results.extend(ScanResult(*r, timestamp_ns) for r in found)
+            if found:
+                logger.info(f"Found {len(found)} vulnerabilities on {url}")
+
+        return results
+
     def scan(self, target_url: str) -> List[ScanResult]:
         """
         Perform complete vulnerability scan on target.
 
+        URLs are scanned on an asyncio event loop when httpx (HTTP/2) or
+        aiohttp is installed, otherwise as a flat list of probes on a
+        thread pool.
+
         Args:
             target_url: Target URL to scan
 
@@ -124,6 +450,8 @@ class VulnerabilityScanner:
         """
         logger.info(f"Starting scan on {target_url}")
         self.scan_results.clear()
+        self._probe_seen.clear()
+        self._page_forms.clear()
 
         try:
             # Step 1: Crawl
@@ -133,21 +461,10 @@ class VulnerabilityScanner:
 
             # Step 2: Parallel scanning
             logger.info("Step 2: Scanning discovered URLs...")
-            with ThreadPoolExecutor(max_workers=self.max_threads) as executor:
-                futures = {
-                    executor.submit(self._scan_single_url, url): url
-                    for url in self.discovered_urls
-                }
-
-                for future in as_completed(futures):
-                    url = futures[future]
-                    try:
-                        results = future.result()
-                        self.scan_results.extend(results)
-                        if results:
-                            logger.info(f"Found {len(results)} vulnerabilities on {url}")
-                    except Exception as e:
-                        logger.error(f"Error processing {url}: {e}")
+            if httpx is not None or aiohttp is not None:
+                self.scan_results.extend(asyncio.run(self._scan_all(self.discovered_urls)))
+            else:
+                self.scan_results.extend(self._scan_all_threaded(self.discovered_urls))
 
         except Exception as e:
             logger.error(f"Scan failed: {e}")
@@ -167,6 +484,8 @@ class VulnerabilityScanner:
         """
         logger.info(f"Starting fast scan on {target_url}")
         self.scan_results.clear()
+        self._probe_seen.clear()
+        self._page_forms.clear()
         self.discovered_urls = [target_url]
 
         results = self._scan_single_url(target_url)
@@ -182,15 +501,7 @@ class VulnerabilityScanner:
         Returns:
             List of vulnerability dictionaries
         """
-        return [
-            {
-                "type": r.vulnerability_type,
-                "endpoint": r.endpoint,
-                "payload": r.payload,
-                "timestamp": r.timestamp
-            }
-            for r in self.scan_results
-        ]
+        return [dict(zip(_RESULT_KEYS, fields)) for fields in map(_RESULT_FIELDS, self.scan_results)]
 
     def get_results_tuples(self) -> List[Tuple[str, str, str]]:
         """
@@ -208,15 +519,12 @@ class VulnerabilityScanner:
         Returns:
             Dictionary with scan statistics
         """
-        results_by_type = {}
-        for result in self.scan_results:
-            vuln_type = result.vulnerability_type
-            results_by_type[vuln_type] = results_by_type.get(vuln_type, 0) + 1
+        results_by_type = Counter(r.vulnerability_type for r in self.scan_results)
 
         return {
             "total_vulnerabilities": len(self.scan_results),
             "total_urls_discovered": len(self.discovered_urls),
-            "vulnerabilities_by_type": results_by_type,
+            "vulnerabilities_by_type": dict(results_by_type),
             "scan_timestamp": datetime.now().isoformat()
         }
 
@@ -0,0 +1,4 @@
+from core.http_utils import create_session
+
+# One keep-alive session shared by all legacy scanner threads
+session = create_session()
\ No newline at end of file
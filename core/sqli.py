@@ -1,21 +1,73 @@
+from concurrent.futures import ThreadPoolExecutor
+from config import MAX_PAGE_SIZE
 from core.payloads import SQLI_PAYLOADS
 from core.analyzer import detect_sqli, boolean_based_check
-from core.injector import inject
+from core.injector import inject, timed_inject
 
-def scan_sqli(url, form):
+SLEEP_SECONDS = 3
+SLEEP_PAYLOAD = "' OR SLEEP(%d)-- " % SLEEP_SECONDS
+CONTROL_PAYLOAD = "' OR SLEEP(0)-- "
+
+# Elapsed seconds, or None when the request failed or timed out (inject
+# returns b"" then), which says nothing about whether SLEEP ran
+def _timed_inject(url, form, payload):
+    body, elapsed = timed_inject(url, form, payload)
+    return elapsed if body else None
+
+# One baseline round trip per endpoint and scan; failed ones are not kept
+def _baseline(url, form, baselines):
+    key = (url, form["action"], form["method"], tuple(form["inputs"]))
+    baseline = baselines.get(key)
+    if baseline is None:
+        baseline = _timed_inject(url, form, "")
+        if baseline is not None:
+            baselines[key] = baseline
+    return baseline
+
+def _time_probe(url, form, baselines):
+    baseline = _baseline(url, form, baselines)
+    if baseline is None:
+        return False
+
+    delayed = _timed_inject(url, form, SLEEP_PAYLOAD)
+    if delayed is None or delayed - baseline <= SLEEP_SECONDS * 0.8:
+        return False
+
+    # Confirm with SLEEP(0): an endpoint that is merely slow on quoted input
+    # is slow here too, while a real injection answers at baseline speed
+    control = _timed_inject(url, form, CONTROL_PAYLOAD)
+    return control is not None and control - baseline <= SLEEP_SECONDS * 0.8
+
+def scan_sqli(url, form, baselines=None):
     results = []
+    if baselines is None:
+        baselines = {}
 
-    # Error-based SQLi
-    for payload in SQLI_PAYLOADS:
-        resp = inject(url, form, payload)
-        if detect_sqli(resp):
-            results.append(("SQL Injection", form["action"], payload))
+    # Error-based and boolean probes are independent: send them all at once
+    with ThreadPoolExecutor(max_workers=len(SQLI_PAYLOADS) + 2) as executor:
+        error_resps = executor.map(
+            lambda payload: inject(url, form, payload, stop=detect_sqli),
+            SQLI_PAYLOADS
+        )
+        # Compared by length, so read up to the page cap rather than the
+        # detection cap, where two large pages would always tie
+        future_true = executor.submit(inject, url, form, "' OR 1=1--", limit=MAX_PAGE_SIZE)
+        future_false = executor.submit(inject, url, form, "' OR 1=2--", limit=MAX_PAGE_SIZE)
 
-    # Boolean-based SQLi
-    resp_true = inject(url, form, "' OR 1=1--")
-    resp_false = inject(url, form, "' OR 1=2--")
+        # Error-based SQLi
+        for payload, resp in zip(SQLI_PAYLOADS, error_resps):
+            if detect_sqli(resp):
+                results.append(("SQL Injection", form["action"], payload))
+
+        resp_true = future_true.result()
+        resp_false = future_false.result()
 
+    # Boolean-based SQLi
     if boolean_based_check(resp_true, resp_false):
         results.append(("Blind SQL Injection", form["action"], "Boolean Based"))
 
+    # Time-based SQLi, only when the cheaper boolean check found nothing
+    elif _time_probe(url, form, baselines):
+        results.append(("Blind SQL Injection", form["action"], "Time Based"))
+
     return results
\ No newline at end of file
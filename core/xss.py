@@ -5,8 +5,12 @@ def scan_xss(url, form):
     results = []
 
     for payload in XSS_PAYLOADS:
-        resp = inject(url, form, payload)
-        if payload in resp:
+        needle = payload.encode()
+
+        # Only the payload sent in this request is attributed to it; the read
+        # stops as soon as it shows up
+        resp = inject(url, form, payload, stop=lambda window: needle in window)
+        if needle in resp:
             results.append(("Reflected XSS", form["action"], payload))
 
     return results
\ No newline at end of file
@@ -1,37 +1,186 @@
 import sqlite3
 import os
+import atexit
+import logging
+import queue
+import threading
+
+logger = logging.getLogger(__name__)
 
 DB_PATH = "database/vulnx.db"
 
+INSERT_SQL = """
+    INSERT INTO vulnerabilities (target, type, endpoint, payload)
+    VALUES (?, ?, ?, ?)
+"""
+
+# Shared connection, opened lazily and reused across requests
+_conn = None
+_conn_lock = threading.Lock()
+_write_lock = threading.Lock()
+
+# Rows queued by enqueue_results, written in batches by one writer thread
+_queue = queue.Queue()
+_writer = None
+_STOP = object()
+BATCH_SIZE = 256
+
+# Attempts per row before the writer gives up on it
+MAX_WRITE_ATTEMPTS = 3
+
+
+def _connect():
+    # Autocommit mode: write transactions are opened explicitly
+    conn = sqlite3.connect(DB_PATH, isolation_level=None, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA cache_size=-64000")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    return conn
+
+
+def get_connection():
+    global _conn
+
+    if _conn is None:
+        with _conn_lock:
+            if _conn is None:
+                _conn = _connect()
+
+    return _conn
+
+
+def close_db():
+    global _conn
+
+    # Never close the connection in the middle of a write
+    with _write_lock, _conn_lock:
+        if _conn is not None:
+            _conn.close()
+            _conn = None
+
+
 def init_db():
     os.makedirs("database", exist_ok=True)
 
-    conn = sqlite3.connect(DB_PATH)
-    cur = conn.cursor()
+    conn = get_connection()
 
-    cur.execute("""
-        CREATE TABLE IF NOT EXISTS vulnerabilities (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            target TEXT,
-            type TEXT,
-            endpoint TEXT,
-            payload TEXT
-        )
-    """)
+    with _write_lock, conn:
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS vulnerabilities (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                target TEXT,
+                type TEXT,
+                endpoint TEXT,
+                payload TEXT
+            )
+        """)
 
-    conn.commit()
-    conn.close()
+    _start_writer()
+
+
+def _write_rows(rows):
+    # One transaction for the whole batch: a single commit/fsync. IMMEDIATE
+    # takes the write lock up front instead of upgrading mid-transaction.
+    with _write_lock:
+        conn = get_connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany(INSERT_SQL, rows)
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
 
 
 def save_results(target, results):
-    conn = sqlite3.connect(DB_PATH)
-    cur = conn.cursor()
+    rows = [(target, r[0], r[1], r[2]) for r in results]
+    if rows:
+        _write_rows(rows)
+
+
+def _retry_failed(failed):
+    # One row per transaction, so a row that can never be stored does not
+    # take the others down with it
+    still_failing = []
+
+    for row, attempts in failed:
+        try:
+            _write_rows([row])
+        except Exception:
+            attempts += 1
+            if attempts < MAX_WRITE_ATTEMPTS:
+                still_failing.append((row, attempts))
+            else:
+                logger.exception(f"DB writer dropped {row} after {attempts} attempts")
+
+    return still_failing
+
+
+def _drain():
+    stopping = False
+    # (row, attempts) for rows not stored yet, retried apart from new batches
+    failed = []
+
+    while not stopping:
+        taken = [_queue.get()]
+
+        # Take whatever else is already waiting, up to BATCH_SIZE rows
+        while len(taken) < BATCH_SIZE:
+            try:
+                taken.append(_queue.get_nowait())
+            except queue.Empty:
+                break
+
+        stopping = _STOP in taken
+        rows = [row for row in taken if row is not _STOP]
+
+        try:
+            failed = _retry_failed(failed)
+            if rows:
+                _write_rows(rows)
+        except Exception:
+            logger.exception(f"DB writer could not store {len(rows)} rows, will retry")
+            failed.extend((row, 1) for row in rows)
+        finally:
+            for _ in taken:
+                _queue.task_done()
+
+    # One more try for the rows of the last batch
+    failed = _retry_failed(failed)
+    if failed:
+        logger.error(f"DB writer stopped with {len(failed)} rows unsaved")
+
+
+def _start_writer():
+    global _writer
+
+    with _conn_lock:
+        if _writer is None or not _writer.is_alive():
+            _writer = threading.Thread(target=_drain, name="db-writer", daemon=True)
+            _writer.start()
+
+
+def enqueue_results(target, results):
+    # Returns at once; the writer thread stores the rows in batches
+    if _writer is None or not _writer.is_alive():
+        _start_writer()
 
     for r in results:
-        cur.execute("""
-            INSERT INTO vulnerabilities (target, type, endpoint, payload)
-            VALUES (?, ?, ?, ?)
-        """, (target, r[0], r[1], r[2]))
+        _queue.put((target, r[0], r[1], r[2]))
+
+
+def flush_and_close():
+    global _writer
+
+    # Write everything still queued, stop the writer, then close the connection
+    if _writer is not None and _writer.is_alive():
+        _queue.put(_STOP)
+        _writer.join()
+    _writer = None
+
+    close_db()
+
 
-    conn.commit()
-    conn.close()
\ No newline at end of file
+# Registered once: write whatever is still queued before the interpreter exits
+atexit.register(flush_and_close)
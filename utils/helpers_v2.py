@@ -1,10 +1,21 @@
 """
 Enhanced utilities module with logging, validation, and helpers.
 """
+import functools
+import html
 import logging
 import re
-from typing import Optional
-from urllib.parse import urlparse
+from collections import Counter
+from typing import Any, Optional
+
+from flask.json.provider import DefaultJSONProvider
+
+from utils.parsing import cached_urlparse, re_engine
+
+try:
+    import orjson
+except ImportError:  # Optional: Flask's stdlib json encoder is used instead
+    orjson = None
 
 # ==================== LOGGING SETUP ====================
 
@@ -49,41 +60,105 @@ class LoggerFactory:
         return logger
 
 
+# ==================== JSON ENCODING ====================
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider that encodes and parses with orjson when it is installed"""
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        """
+        Serialize data as JSON text.
+
+        Args:
+            obj: Data to serialize
+
+        Returns:
+            JSON string
+        """
+        if orjson is None or kwargs:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default).decode()
+
+    def loads(self, s: Any, **kwargs: Any) -> Any:
+        """
+        Deserialize JSON text or bytes, as used by request.get_json.
+
+        Args:
+            s: JSON document
+
+        Returns:
+            Deserialized data
+        """
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args: Any, **kwargs: Any):
+        """
+        Build a JSON response, as used by flask.jsonify.
+
+        Returns:
+            Response with an application/json body
+        """
+        if orjson is None:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            orjson.dumps(obj, default=self.default),
+            mimetype=self.mimetype
+        )
+
+
 # ==================== URL VALIDATION ====================
 
 
 class URLValidator:
     """Validates and sanitizes URLs"""
 
-    URL_PATTERN = re.compile(
-        r'^https?://'  # http:// or https://
+    # Compiled once at import; is_valid anchors it with fullmatch
+    URL_PATTERN = re_engine.compile(
+        r'(?i)'  # case-insensitive (inline: re2 has no IGNORECASE flag)
+        r'https?://'  # http:// or https://
         r'(?:(?:[A-Z0-9](?:[A-Z0-9-]{0,61}[A-Z0-9])?\.)+[A-Z]{2,6}\.?|'  # domain
         r'localhost|'  # localhost
         r'\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})'  # or IP
         r'(?::\d+)?'  # optional port
-        r'(?:/?|[/?]\S+)$', re.IGNORECASE)
+        r'(?:/?|[/?]\S+)')
 
     @staticmethod
     def is_valid(url: str) -> bool:
         """
         Validate URL format.
 
+        Results are cached since crawled pages link to the same URLs repeatedly.
+        Non-string input (e.g. from a JSON body) is rejected before the cache
+        is consulted, since it may not be hashable.
+
         Args:
             url: URL to validate
 
         Returns:
             True if URL is valid
         """
+        if not isinstance(url, str):
+            return False
+        return URLValidator._is_valid_cached(url)
+
+    @staticmethod
+    @functools.lru_cache(maxsize=10000)
+    def _is_valid_cached(url: str) -> bool:
+        """Cached is_valid for a str argument"""
         if not url:
             return False
 
         try:
-            result = urlparse(url)
-            return all([
-                result.scheme in ('http', 'https'),
-                result.netloc,
-                URLValidator.URL_PATTERN.match(url)
-            ])
+            result = cached_urlparse(url)
+            return bool(
+                result.scheme in ('http', 'https')
+                and result.netloc
+                and URLValidator.URL_PATTERN.fullmatch(url)
+            )
         except Exception:
             return False
 
@@ -92,12 +167,23 @@ class URLValidator:
         """
         Normalize URL to standard format.
 
+        Results are cached since the same targets are re-validated often.
+        Non-string input is rejected before the cache is consulted.
+
         Args:
             url: URL to normalize
 
         Returns:
             Normalized URL or None if invalid
         """
+        if not isinstance(url, str):
+            return None
+        return URLValidator._normalize_cached(url)
+
+    @staticmethod
+    @functools.lru_cache(maxsize=1024)
+    def _normalize_cached(url: str) -> Optional[str]:
+        """Cached normalize for a str argument"""
         if not url:
             return None
 
@@ -124,8 +210,7 @@ class URLValidator:
             Domain or None if invalid
         """
         try:
-            parsed = urlparse(url)
-            return parsed.netloc
+            return cached_urlparse(url).netloc
         except Exception:
             return None
 
@@ -152,6 +237,17 @@ class URLValidator:
 class PayloadSanitizer:
     """Sanitizes and validates payloads"""
 
+    # Known test patterns, matched in one pass
+    SAFE_PATTERN = re_engine.compile("|".join(map(re.escape, [
+        "alert(",
+        "OR 1=1",
+        "' OR '",
+        "UNION SELECT",
+        "<script>",
+        "onerror=",
+        "onload="
+    ])))
+
     @staticmethod
     def is_safe_payload(payload: str) -> bool:
         """
@@ -163,17 +259,7 @@ class PayloadSanitizer:
         Returns:
             True if payload seems safe for testing
         """
-        # Known test patterns
-        safe_patterns = [
-            "alert(",
-            "OR 1=1",
-            "' OR '",
-            "UNION SELECT",
-            "<script>",
-            "onerror=",
-            "onload="
-        ]
-        return any(pattern in payload for pattern in safe_patterns)
+        return PayloadSanitizer.SAFE_PATTERN.search(payload) is not None
 
     @staticmethod
     def escape_html(text: str) -> str:
@@ -186,16 +272,8 @@ class PayloadSanitizer:
         Returns:
             Escaped text
         """
-        replacements = {
-            '&': '&amp;',
-            '<': '&lt;',
-            '>': '&gt;',
-            '"': '&quot;',
-            "'": '&#x27;'
-        }
-        for char, escape in replacements.items():
-            text = text.replace(char, escape)
-        return text
+        # Same five entities as before (' becomes &#x27;), in a single pass
+        return html.escape(text, quote=True)
 
 
 # ==================== RESULT FORMATTING ====================
@@ -222,33 +300,20 @@ class ResultFormatter:
         if headers is None:
             headers = list(results[0].keys()) if results else []
 
-        # Calculate column widths
-        widths = {header: len(header) for header in headers}
-        for result in results:
-            for header in headers:
-                value = str(result.get(header, ""))
-                widths[header] = max(widths[header], len(value))
-
-        # Build table
-        lines = []
-        separator = "+".join("-" * (widths[h] + 2) for h in headers)
-        lines.append("+" + separator + "+")
-
-        # Headers
-        header_line = "|".join(
-            f" {header:<{widths[header]}} " for header in headers
-        )
-        lines.append("|" + header_line + "|")
-        lines.append("+" + separator + "+")
+        # Convert every cell to text once, then size columns from the rows
+        rows = [[str(result.get(h, "")) for h in headers] for result in results]
+        widths = [
+            max(len(header), *(len(row[i]) for row in rows))
+            for i, header in enumerate(headers)
+        ]
 
-        # Rows
-        for result in results:
-            row_line = "|".join(
-                f" {str(result.get(h, '')):<{widths[h]}} " for h in headers
-            )
-            lines.append("|" + row_line + "|")
+        # One format string renders a whole row
+        row_format = "| " + " | ".join(f"{{:<{w}}}" for w in widths) + " |"
+        separator = "+" + "+".join("-" * (w + 2) for w in widths) + "+"
 
-        lines.append("+" + separator + "+")
+        lines = [separator, row_format.format(*headers), separator]
+        lines.extend(row_format.format(*row) for row in rows)
+        lines.append(separator)
         return "\n".join(lines)
 
     @staticmethod
@@ -278,7 +343,7 @@ class ScanStatistics:
         self.total_forms = 0
         self.total_payloads_tested = 0
         self.total_vulnerabilities = 0
-        self.vulnerabilities_by_type = {}
+        self.vulnerabilities_by_type = Counter()
         self.start_time = None
         self.end_time = None
 
@@ -297,9 +362,7 @@ class ScanStatistics:
     def record_vulnerability(self, vuln_type: str):
         """Record vulnerability discovery"""
         self.total_vulnerabilities += 1
-        self.vulnerabilities_by_type[vuln_type] = (
-            self.vulnerabilities_by_type.get(vuln_type, 0) + 1
-        )
+        self.vulnerabilities_by_type[vuln_type] += 1
 
     def get_summary(self) -> dict:
         """Get statistics summary"""
@@ -308,6 +371,6 @@ class ScanStatistics:
             "total_forms": self.total_forms,
             "total_payloads_tested": self.total_payloads_tested,
             "total_vulnerabilities": self.total_vulnerabilities,
-            "vulnerabilities_by_type": self.vulnerabilities_by_type
+            "vulnerabilities_by_type": dict(self.vulnerabilities_by_type)
         }
 
@@ -0,0 +1,21 @@
+"""
+Shared parsing helpers: the regex engine used by the detectors and
+validators, and a memoized URL parser.
+"""
+import functools
+import re
+from urllib.parse import urlparse
+
+try:
+    # Linear-time DFA matcher when google-re2 is installed
+    import re2 as re_engine
+
+    # Patterns are written for both engines: bytes input and inline flags
+    # such as (?i), since re2 has no IGNORECASE constant. Check once here so
+    # an incompatible re2 build falls back instead of failing every import.
+    re_engine.compile(rb"(?i)a|\d+").search(b"A")
+except Exception:  # Optional: fall back to the stdlib backtracking engine
+    re_engine = re
+
+# Menus and footers repeat the same links on every page; parse each URL once
+cached_urlparse = functools.lru_cache(maxsize=65536)(urlparse)
@@ -1,5 +1,5 @@
-from urllib.parse import urlparse
+from utils.parsing import cached_urlparse
 
 def is_valid_url(url):
-    parsed = urlparse(url)
+    parsed = cached_urlparse(url)
     return bool(parsed.netloc) and bool(parsed.scheme)
\ No newline at end of file